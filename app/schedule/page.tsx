@@ -8,7 +8,7 @@ import { Card, CardContent } from "@/components/ui/card";
 import { HoverCard, HoverCardContent, HoverCardTrigger } from "@/components/ui/hover-card";
 import { Upload, ChevronLeft, ChevronRight, Loader2, Trash2 } from "lucide-react";
 import { cn } from "@/lib/utils";
-import { uploadSchedule, getEvents } from "@/lib/api";
+import { uploadSchedule, getEvents, getFirstEventDate } from "@/lib/api";
 
 interface Event {
     id?: string;
@@ -27,29 +27,33 @@ export default function SchedulePage() {
     const [currentDate, setCurrentDate] = useState(new Date());
     const [isUploading, setIsUploading] = useState(false);
     const [events, setEvents] = useState<Event[]>([]);
+    const [initialized, setInitialized] = useState(false);
+
+    // Calendar Generation Logic
+    const monthStart = startOfMonth(currentDate);
+    const monthEnd = endOfMonth(monthStart);
+    const startDate = startOfWeek(monthStart);
+    const endDate = endOfWeek(monthEnd);
+    const rangeFrom = format(startDate, "yyyy-MM-dd");
+    const rangeTo = format(endDate, "yyyy-MM-dd");
 
     useEffect(() => {
         fetchEvents();
-    }, []);
+    }, [rangeFrom, rangeTo]);
 
     const fetchEvents = async () => {
         try {
-            const data = await getEvents();
+            // Only the visible weeks are read from the server
+            const data = await getEvents({ from: rangeFrom, to: rangeTo });
             setEvents(data);
 
-            // UX Enhancement: If there are events, but none in current view, jump to the nearest event
-            if (data && data.length > 0) {
-                const hasEventInCurrentMonth = data.some((e: Event) => isSameMonth(new Date(e.date), currentDate));
-                if (!hasEventInCurrentMonth) {
-                    // Sort events by date
-                    const sorted = [...data].sort((a: Event, b: Event) => new Date(a.date).getTime() - new Date(b.date).getTime());
-                    // Find first event after today, or just first event
-                    const today = new Date();
-                    const futureEvent = sorted.find((e: Event) => new Date(e.date) >= today);
-                    const targetEvent = futureEvent || sorted[sorted.length - 1]; // Closest future, or last past
-
-                    if (targetEvent) {
-                        setCurrentDate(new Date(targetEvent.date));
+            // UX Enhancement: on first load, if the current view is empty, jump to the next upcoming event
+            if (!initialized) {
+                setInitialized(true);
+                if (!data || data.length === 0) {
+                    const nextDate = await getFirstEventDate(format(new Date(), "yyyy-MM-dd"));
+                    if (nextDate) {
+                        setCurrentDate(new Date(nextDate));
                     }
                 }
             }
@@ -58,12 +62,6 @@ export default function SchedulePage() {
         }
     };
 
-    // Calendar Generation Logic
-    const monthStart = startOfMonth(currentDate);
-    const monthEnd = endOfMonth(monthStart);
-    const startDate = startOfWeek(monthStart);
-    const endDate = endOfWeek(monthEnd);
-
     const calendarDays = eachDayOfInterval({
         start: startDate,
         end: endDate,
@@ -86,7 +84,11 @@ export default function SchedulePage() {
         setIsUploading(true);
         try {
             const data = await uploadSchedule(file);
-            alert("일정이 성공적으로 업로드되었습니다.");
+            if (data.partial) {
+                alert("일부 일정만 업로드되었습니다. 같은 파일을 다시 업로드하면 실패한 부분만 다시 처리합니다.");
+            } else {
+                alert("일정이 성공적으로 업로드되었습니다.");
+            }
 
             // Demo Mode support: Use returned events directly if available
             if (data.events && Array.isArray(data.events) && data.events.length > 0) {
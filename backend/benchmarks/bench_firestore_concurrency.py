@@ -0,0 +1,73 @@
+"""
+Load test: does DB I/O overlap across concurrent requests?
+
+Drives GET /tasks/ in-process against the fake Firestore (blocking `--latency`
+per call) at increasing concurrency. "offloaded" is the current code path
+(run_db thread pool); "inline" calls the client on the event loop, as the
+routers used to, for comparison.
+
+    python -m backend.benchmarks.bench_firestore_concurrency --latency 0.02 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from backend.benchmarks.fake_firestore import use_fake_firestore
+
+
+async def inline_run_db(fn, *args, collection=None, op=None, docs=None, **kwargs):
+    return fn(*args, **kwargs)
+
+
+async def drive(client: httpx.AsyncClient, total: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            resp = await client.get("/tasks/", params={"uid": "bench"})
+            resp.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - started
+
+
+async def main(args):
+    from backend.main import app
+    from backend.routers import tasks
+
+    db = use_fake_firestore(latency=0)
+    for i in range(50):
+        db.collection("tasks").document(f"t{i}").set({
+            "id": f"t{i}", "uid": "bench", "content": f"task {i}", "is_deleted": False, "is_completed": False,
+        })
+    db.latency = args.latency
+
+    results = []
+    original = tasks.run_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for mode in ("inline", "offloaded"):
+            tasks.run_db = inline_run_db if mode == "inline" else original
+            for concurrency in args.concurrency:
+                elapsed = await drive(client, args.requests, concurrency)
+                results.append({
+                    "mode": mode,
+                    "concurrency": concurrency,
+                    "requests": args.requests,
+                    "elapsed_s": round(elapsed, 3),
+                    "throughput_rps": round(args.requests / elapsed, 1),
+                })
+    tasks.run_db = original
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="blocking seconds per Firestore call")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    asyncio.run(main(parser.parse_args()))
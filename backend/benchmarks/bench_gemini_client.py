@@ -0,0 +1,98 @@
+"""
+Micro-benchmark: one httpx client per Gemini call vs. the shared pooled client.
+
+Runs against the local fake Gemini server, so no API key or network is needed.
+`--connect-delay` emulates the TCP/TLS handshake cost of a fresh connection.
+
+    python -m backend.benchmarks.bench_gemini_client --requests 200 --concurrency 10 --connect-delay 0.03
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from backend.benchmarks.fake_gemini import FakeGeminiServer
+from backend.services.gemini import GeminiService
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+async def call_per_request_client(service: GeminiService, prompt: str) -> str:
+    # Previous behaviour: new client (and connection) for every call
+    url = f"{service.base_url}/{service.model_name}:generateContent?key={service.api_key}"
+    async with httpx.AsyncClient() as client:
+        resp = await client.post(url, json={"contents": [{"parts": [{"text": prompt}]}]}, timeout=120.0)
+        return resp.json()['candidates'][0]['content']['parts'][0]['text']
+
+
+async def run_mode(name: str, call, total: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with sem:
+            start = time.perf_counter()
+            await call(f"prompt {i}")
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": name,
+        "requests": total,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 4),
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def main(args):
+    server = FakeGeminiServer(latency=args.latency, connect_delay=args.connect_delay, text="ok")
+    await server.start()
+
+    service = GeminiService()
+    service.api_key = "bench"
+    service.base_url = server.base_url
+    # The stub speaks HTTP/1.1 only
+    service.http2 = False
+
+    results = []
+    try:
+        server.connections = 0
+        result = await run_mode("per_call_client", lambda p: call_per_request_client(service, p),
+                                args.requests, args.concurrency)
+        result["connections"] = server.connections
+        results.append(result)
+
+        server.connections = 0
+        await service.startup()
+        result = await run_mode("shared_client", service.generate_content, args.requests, args.concurrency)
+        result["connections"] = server.connections
+        results.append(result)
+    finally:
+        await service.shutdown()
+        await server.stop()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.005, help="stub processing time per request (s)")
+    parser.add_argument("--connect-delay", type=float, default=0.03, help="stub handshake time per connection (s)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,110 @@
+"""
+Serialization time and bytes on the wire for large list responses.
+
+1. Encoder, on synthetic schedule/task payloads:
+   - stock: FastAPI's default path (jsonable_encoder + JSONResponse)
+   - fast_response: jsonable_encoder + FastJSONResponse (plain endpoint returns)
+   - direct: `dumps` alone, as the ETag'd GET /tasks/, /memos/, /schedule/ do
+2. Wire size: GET /schedule/ through the app (fake Firestore) with
+   Accept-Encoding identity, gzip and br (br needs brotli-asgi installed).
+
+    python -m backend.benchmarks.bench_responses --events 3000 --tasks 500 --rounds 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from backend.benchmarks.fake_firestore import use_fake_firestore
+from backend.services.serialization import FastJSONResponse, USE_ORJSON, dumps
+
+
+def make_events(n: int) -> list:
+    start = date(2025, 3, 2)
+    return [{
+        "id": f"e{i:05d}",
+        "title": f"학년 협의회 {i}",
+        "date": (start + timedelta(days=i % 300)).isoformat(),
+        "time": f"{9 + i % 8:02d}:00",
+        "location": "본관 3층 회의실",
+        "participants": "2학년 담임",
+        "manager": "교무부",
+        "type": "official",
+        "note": "",
+    } for i in range(n)]
+
+
+def make_tasks(n: int) -> list:
+    return [{
+        "id": f"t{i:05d}",
+        "uid": "bench",
+        "content": f"Prepare report {i}",
+        "due_date": "2025-04-01",
+        "priority": "Medium",
+        "is_completed": i % 3 == 0,
+        "is_deleted": False,
+        "created_at": "2025-03-01T09:00:00",
+    } for i in range(n)]
+
+
+def time_encoder(name: str, render, payload, rounds: int) -> dict:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        body = render(payload)
+    elapsed = time.perf_counter() - started
+    return {"encoder": name, "ms_per_response": round(elapsed / rounds * 1000, 3), "bytes": len(body)}
+
+
+def stock_render(payload) -> bytes:
+    # What an endpoint returning a list costs with FastAPI's default response class
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def fast_render(payload) -> bytes:
+    return FastJSONResponse(jsonable_encoder(payload)).body
+
+
+def direct_render(payload) -> bytes:
+    return dumps(payload)
+
+
+async def wire_sizes(events: list) -> list:
+    from backend.main import app
+
+    db = use_fake_firestore()
+    for event in events:
+        db.collection("events").document(event["id"]).set(event)
+
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for encoding in ("identity", "gzip", "br"):
+            resp = await client.get("/schedule/", headers={"Accept-Encoding": encoding})
+            results.append({
+                "accept_encoding": encoding,
+                "content_encoding": resp.headers.get("content-encoding", "identity"),
+                "wire_bytes": int(resp.headers["content-length"]),
+            })
+    return results
+
+
+def main(args):
+    report = {"orjson_enabled": USE_ORJSON, "encoders": [], "wire": []}
+    for label, payload in (("schedule", make_events(args.events)), ("tasks", make_tasks(args.tasks))):
+        for name, render in (("stock", stock_render), ("fast_response", fast_render), ("direct", direct_render)):
+            report["encoders"].append({"payload": label, **time_encoder(name, render, payload, args.rounds)})
+    report["wire"] = asyncio.run(wire_sizes(make_events(args.events)))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=3000)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    main(parser.parse_args())
@@ -0,0 +1,236 @@
+"""
+In-memory stand-in for the subset of the firebase_admin Firestore client this
+API uses. Every blocking call sleeps for `latency` seconds, like a network
+round-trip would, so benchmarks show how DB I/O interacts with the event loop.
+
+Install it with `use_fake_firestore(...)` before driving `backend.main:app`.
+"""
+import copy
+import threading
+import time
+import uuid
+
+_OPS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    "<": lambda a, b: a is not None and a < b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "in": lambda a, b: a in b,
+}
+
+
+class FakeSnapshot:
+    def __init__(self, ref, data):
+        self.reference = ref
+        self.id = ref.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentRef:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self.id = doc_id
+
+    def get(self, transaction=None):
+        self._collection._client._wait()
+        with self._collection._client._lock:
+            return FakeSnapshot(self, copy.deepcopy(self._collection._docs.get(self.id)))
+
+    def set(self, data, merge=False):
+        self._collection._client._wait()
+        self._set(data, merge)
+
+    def update(self, data):
+        self._collection._client._wait()
+        self._update(data)
+
+    def delete(self):
+        self._collection._client._wait()
+        self._delete()
+
+    def _set(self, data, merge=False):
+        with self._collection._client._lock:
+            docs = self._collection._docs
+            if merge and self.id in docs:
+                docs[self.id].update(copy.deepcopy(data))
+            else:
+                docs[self.id] = copy.deepcopy(data)
+
+    def _update(self, data):
+        with self._collection._client._lock:
+            docs = self._collection._docs
+            if self.id not in docs:
+                raise KeyError(f"No document to update: {self._collection.name}/{self.id}")
+            docs[self.id].update(copy.deepcopy(data))
+
+    def _delete(self):
+        with self._collection._client._lock:
+            self._collection._docs.pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, collection, filters=None, orders=None, limit_=None, offset_=0, start_after_=None, fields=None):
+        self._collection = collection
+        self._filters = filters or []
+        self._orders = orders or []
+        self._limit = limit_
+        self._offset = offset_
+        self._start_after = start_after_
+        self._fields = fields
+
+    def _copy(self, **kw):
+        args = dict(filters=list(self._filters), orders=list(self._orders), limit_=self._limit,
+                    offset_=self._offset, start_after_=self._start_after, fields=self._fields)
+        args.update(kw)
+        return FakeQuery(self._collection, **args)
+
+    def where(self, field, op, value):
+        return self._copy(filters=self._filters + [(field, op, value)])
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._copy(orders=self._orders + [(field, direction)])
+
+    def limit(self, n):
+        return self._copy(limit_=n)
+
+    def offset(self, n):
+        return self._copy(offset_=n)
+
+    def start_after(self, values):
+        return self._copy(start_after_=values)
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def _sort_key(self, item):
+        doc_id, data = item
+        return tuple(data.get(f) if f != "__name__" else doc_id for f, _ in self._orders) + (doc_id,)
+
+    def stream(self):
+        client = self._collection._client
+        client._wait()
+        with client._lock:
+            items = [(k, copy.deepcopy(v)) for k, v in self._collection._docs.items()]
+        for field, op, value in self._filters:
+            items = [(k, v) for k, v in items if _OPS[op](v.get(field), value)]
+        if self._orders:
+            descending = any(str(d).upper().startswith("DESC") for _, d in self._orders)
+            items.sort(key=lambda kv: tuple("" if x is None else x for x in self._sort_key(kv)), reverse=descending)
+        if self._start_after is not None:
+            if isinstance(self._start_after, dict):
+                marker = tuple(self._start_after.get(f) for f, _ in self._orders)
+            else:
+                marker = tuple(self._start_after)
+            n = len(marker)
+            items = [kv for kv in items if self._sort_key(kv)[:n] > marker]
+        items = items[self._offset:]
+        if self._limit is not None:
+            items = items[:self._limit]
+        for doc_id, data in items:
+            if self._fields is not None:
+                data = {f: data[f] for f in self._fields if f in data}
+            yield FakeSnapshot(FakeDocumentRef(self._collection, doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client, name):
+        self._client = client
+        self.name = name
+        self._docs = {}
+        super().__init__(self)
+
+    def document(self, doc_id=None):
+        return FakeDocumentRef(self, doc_id or uuid.uuid4().hex[:20])
+
+    def list_documents(self):
+        self._client._wait()
+        with self._client._lock:
+            return [FakeDocumentRef(self, k) for k in list(self._docs)]
+
+
+class FakeBatch:
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(lambda: ref._set(data, merge))
+
+    def update(self, ref, data):
+        self._ops.append(lambda: ref._update(data))
+
+    def delete(self, ref):
+        self._ops.append(ref._delete)
+
+    def commit(self):
+        if len(self._ops) > 500:
+            raise ValueError("maximum 500 writes allowed per request")
+        self._client._wait()
+        for op in self._ops:
+            op()
+        self._ops = []
+
+
+class FakeTransaction(FakeBatch):
+    pass
+
+
+class FakeFirestore:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.RLock()
+        self._collections = {}
+
+    def _wait(self):
+        self.calls += 1
+        if self.latency:
+            # Blocking on purpose: this is what a synchronous client does
+            time.sleep(self.latency)
+
+    def collection(self, name):
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = FakeCollection(self, name)
+            return self._collections[name]
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+    def run_transaction(self, fn):
+        """Serializable stand-in for `firestore.transactional`: runs fn(transaction) under the store lock."""
+        with self._lock:
+            transaction = self.transaction()
+            result = fn(transaction)
+            transaction.commit()
+            return result
+
+    def get_all(self, refs):
+        self._wait()
+        for ref in refs:
+            yield FakeSnapshot(ref, copy.deepcopy(ref._collection._docs.get(ref.id)))
+
+
+def use_fake_firestore(latency: float = 0.0) -> FakeFirestore:
+    """Points the app's `get_db()` at a fresh FakeFirestore and returns it."""
+    from backend.services.firebase import db_service
+    db_service.db = FakeFirestore(latency)
+    return db_service.db
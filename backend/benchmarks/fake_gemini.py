@@ -0,0 +1,184 @@
+"""
+Minimal local stand-in for the Gemini REST API, used by the benchmarks.
+
+Speaks plain HTTP/1.1 with keep-alive and answers every
+`POST .../models/<model>:generateContent` with a canned response: `text`,
+or `respond(prompt)` if given, so one server can answer different prompt
+kinds plausibly. `:streamGenerateContent?alt=sse` streams the same text as
+SSE chunks, spreading the latency across them.
+
+    python -m backend.benchmarks.fake_gemini --port 8765 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import re
+
+
+def _candidate(text: str, prompt_tokens: int = 0) -> dict:
+    # Rough token counts (~4 characters per token), so usage metrics have something to show
+    response_tokens = len(text) // 4
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}], "role": "model"}}],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": response_tokens,
+            "totalTokenCount": prompt_tokens + response_tokens,
+        },
+    }
+
+
+def canned_response(text: str, prompt_tokens: int = 0) -> bytes:
+    return json.dumps(_candidate(text, prompt_tokens), ensure_ascii=False).encode("utf-8")
+
+
+def request_prompt(body: bytes) -> str:
+    try:
+        return json.loads(body)["contents"][0]["parts"][0]["text"]
+    except (ValueError, KeyError, IndexError, TypeError):
+        return ""
+
+
+_NUMBERED_LINE = re.compile(r"^(\d+)\. (.+)$", re.MULTILINE)
+_USER_INPUT = re.compile(r'User Input: "(.*)"', re.DOTALL)
+
+BRIEFING_TEXT = (
+    "[오늘의 중점 (할 일 및 일정)]\n- 마감이 지난 업무와 오늘 마감인 업무를 우선 처리하십시오.\n\n"
+    "[오늘 일정]\n- 09:00 교무회의 (교무실)\n\n[내일 일정]\n- 일정 없음\n\n"
+    "[이번 주 주요 일정]\n- 학년별 협의회\n\n[다음 주 주요 예고]\n- 일정 없음\n\n"
+    "[기타 메모 및 할 일]\n- 메모를 확인하십시오.\n"
+)
+
+
+def plausible_response(prompt: str) -> str:
+    """Output shaped like what the app's prompts ask for: task JSON, batch JSON, events, or a briefing."""
+    if "separate to-do item" in prompt:
+        lines = _NUMBERED_LINE.findall(prompt.split("Lines:", 1)[-1])
+        return json.dumps([
+            {"index": int(n), "task": text.strip(), "due_date": None, "priority": "Medium"} for n, text in lines
+        ], ensure_ascii=False)
+    if "Extract the following details" in prompt:
+        m = _USER_INPUT.search(prompt)
+        return json.dumps({"task": m.group(1) if m else "task", "due_date": None, "priority": "Medium"}, ensure_ascii=False)
+    if "브리핑" in prompt:
+        return BRIEFING_TEXT
+    # Schedule extraction: nothing beyond what the local parser found
+    return "[]"
+
+
+def split_chunks(text: str, n: int) -> list:
+    size = max(1, -(-len(text) // n))
+    return [text[i:i + size] for i in range(0, len(text), size)] or [""]
+
+
+class FakeGeminiServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 connect_delay: float = 0.0, text: str = "[]", stream_chunks: int = 8, respond=None):
+        self.host = host
+        self.port = port
+        # Per-request processing time
+        self.latency = latency
+        # Extra delay for every new connection, to emulate TCP/TLS handshake RTTs
+        self.connect_delay = connect_delay
+        self.text = text
+        # Optional respond(prompt) -> text, overriding `text`
+        self.respond = respond
+        self.stream_chunks = stream_chunks
+        self.connections = 0
+        self.requests = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1beta/models"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                headers = {}
+                for line in head.decode("latin-1").split("\r\n")[1:]:
+                    if ":" in line:
+                        k, v = line.split(":", 1)
+                        headers[k.strip().lower()] = v.strip()
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                self.requests += 1
+                prompt = request_prompt(body)
+                text = self.respond(prompt) if self.respond else self.text
+                request_line = head.split(b"\r\n", 1)[0]
+                if b":streamGenerateContent" in request_line:
+                    await self._stream(writer, text, len(prompt) // 4)
+                    if headers.get("connection", "").lower() == "close":
+                        break
+                    continue
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                body = canned_response(text, len(prompt) // 4)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer: asyncio.StreamWriter, text: str, prompt_tokens: int):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        chunks = split_chunks(text, self.stream_chunks)
+        for piece in chunks:
+            if self.latency:
+                await asyncio.sleep(self.latency / len(chunks))
+            event = b"data: " + json.dumps(_candidate(piece, prompt_tokens), ensure_ascii=False).encode("utf-8") + b"\r\n\r\n"
+            writer.write(f"{len(event):X}\r\n".encode() + event + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+async def _serve(args):
+    server = FakeGeminiServer(args.host, args.port, args.latency, args.connect_delay, args.text,
+                              respond=plausible_response if args.plausible else None)
+    await server.start()
+    print(f"Fake Gemini listening on {server.base_url}")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--connect-delay", type=float, default=0.0, help="seconds per new connection")
+    parser.add_argument("--text", default="[]", help="canned model output")
+    parser.add_argument("--plausible", action="store_true", help="answer each prompt kind with matching output instead of --text")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,370 @@
+"""
+End-to-end load test: drives backend.main:app with a weighted mix of
+/briefing/, /tasks/*, /memos/ and /schedule/* requests from synthetic users
+and reports throughput and p50/p95/p99 latency (overall and per scenario)
+as JSON.
+
+By default everything runs in-process and offline: the app is served through
+httpx's ASGI transport, Gemini is the local fake server (`--gemini-latency`,
+answers shaped like each prompt expects), and the data store is one of
+
+    demo      the in-memory demo store (get_db() is None)
+    fake      the in-memory fake Firestore, `--db-latency` seconds per call
+    sqlite    a throwaway SQLite file (LOCAL_DB_PATH mode)
+    emulator  the Firestore emulator; set FIRESTORE_EMULATOR_HOST first
+
+Data is seeded through the API (bulk tasks, memos, one schedule upload), and
+the random mix is seeded (`--seed`), so runs are repeatable.
+
+    python -m backend.benchmarks.load_test --store fake --db-latency 0.01 --concurrency 1,10,50
+    python -m backend.benchmarks.load_test --output baseline.json
+    python -m backend.benchmarks.load_test --baseline baseline.json --max-regression 0.25
+
+With `--baseline`, the exit status is 1 if any scenario's p95 got more than
+`--max-regression` slower than in the baseline run, so CI can gate on it.
+
+`--url http://host:port` drives an already running server instead (start the
+fake Gemini with `python -m backend.benchmarks.fake_gemini --plausible` and
+point the server's GEMINI_BASE_URL at it).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+import httpx
+from openpyxl import Workbook
+
+from backend.benchmarks.fake_gemini import FakeGeminiServer, plausible_response
+
+# Relative frequency of each scenario in the mix
+DEFAULT_MIX = {
+    "briefing": 2,
+    "briefing_refresh": 1,
+    "tasks_list": 6,
+    "tasks_create": 2,
+    "tasks_update": 2,
+    "tasks_bulk": 1,
+    "tasks_analyze": 2,
+    "tasks_analyze_batch": 1,
+    "memos_get": 4,
+    "memos_patch": 2,
+    "events_list": 3,
+    "schedule_upload": 1,
+}
+
+TASK_WORDS = ["학부모 상담 일정 잡기", "생활기록부 점검", "교육과정 협의회 자료", "시험 문항 검토", "출결 마감",
+              "방과후 강사 계약", "prepare staff meeting notes", "review lesson plans", "submit budget report"]
+# Half of these resolve locally, the rest go to (fake) Gemini
+ANALYZE_INPUTS = ["내일까지 {w}", "{w} 급함", "다음주 화요일 {w}", "3/15 {w}",
+                  "{w} 다음 회의 전에", "{w} before the board meeting", "{w} due after the holidays", "{w} 급함 천천히"]
+
+
+def make_workbook(rng: random.Random, rows: int, start: date) -> bytes:
+    """A school schedule sheet the local parser recognizes (날짜/시간/행사/장소)."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "학사일정"
+    ws.append(["날짜", "시간", "행사", "장소", "담당"])
+    for _ in range(rows):
+        day = start + timedelta(days=rng.randrange(120))
+        ws.append([
+            day.isoformat(), f"{rng.randrange(8, 18):02d}:00",
+            f"{rng.choice(TASK_WORDS)} {uuid.UUID(int=rng.getrandbits(128)).hex[:6]}",
+            rng.choice(["교무실", "강당", "회의실"]), rng.choice(["교무부", "학년부", "행정실"]),
+        ])
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+class LoadTest:
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.users = [f"bench_user_{i}" for i in range(args.users)]
+        self.task_ids = {uid: [] for uid in self.users}
+        self.memo_versions = {uid: 0 for uid in self.users}
+        mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+        self.scenarios = list(mix)
+        self.weights = [mix[name] for name in self.scenarios]
+
+    async def seed(self):
+        today = date.today()
+        for uid in self.users:
+            ops = [{
+                "op": "create",
+                "task": f"{self.rng.choice(TASK_WORDS)} #{i}",
+                "due_date": (today + timedelta(days=self.rng.randrange(-5, 20))).isoformat() if i % 3 else None,
+                "priority": self.rng.choice(["High", "Medium", "Low"]),
+            } for i in range(self.args.tasks_per_user)]
+            resp = await self.client.post("/tasks/bulk", params={"uid": uid}, json={"operations": ops})
+            resp.raise_for_status()
+            self.task_ids[uid] = [r["id"] for r in resp.json()["results"] if r.get("status") == "success"]
+
+            items = [{"id": f"m{i}", "text": f"메모 {i}", "checked": False} for i in range(self.args.memos_per_user)]
+            resp = await self.client.post("/memos/", params={"uid": uid}, json={"items": items})
+            resp.raise_for_status()
+            self.memo_versions[uid] = int(resp.headers.get("X-Memos-Version", 0))
+
+        workbook = make_workbook(self.rng, self.args.events, today - timedelta(days=30))
+        resp = await self.client.post("/schedule/upload", files={"file": ("seed.xlsx", workbook)})
+        resp.raise_for_status()
+
+    # Scenarios: each sends one request and returns its response
+
+    async def briefing(self, uid):
+        return await self.client.get("/briefing/", params={"uid": uid})
+
+    async def briefing_refresh(self, uid):
+        return await self.client.get("/briefing/", params={"uid": uid, "force_refresh": "true"})
+
+    async def tasks_list(self, uid):
+        return await self.client.get("/tasks/", params={"uid": uid})
+
+    async def tasks_create(self, uid):
+        resp = await self.client.post("/tasks/", json={"uid": uid, "task": self.rng.choice(TASK_WORDS), "priority": "Medium"})
+        if resp.status_code == 200:
+            self.task_ids[uid].append(resp.json()["id"])
+        return resp
+
+    async def tasks_update(self, uid):
+        if not self.task_ids[uid]:
+            return await self.tasks_create(uid)
+        task_id = self.rng.choice(self.task_ids[uid])
+        return await self.client.patch(f"/tasks/{task_id}", params={"uid": uid},
+                                       json={"is_completed": self.rng.random() < 0.5})
+
+    async def tasks_bulk(self, uid):
+        ops = [{"op": "create", "task": self.rng.choice(TASK_WORDS)} for _ in range(5)]
+        ops += [{"op": "update", "id": task_id, "updates": {"priority": "High"}}
+                for task_id in self.rng.sample(self.task_ids[uid], min(5, len(self.task_ids[uid])))]
+        return await self.client.post("/tasks/bulk", params={"uid": uid}, json={"operations": ops})
+
+    def analyze_input(self) -> str:
+        return self.rng.choice(ANALYZE_INPUTS).format(w=self.rng.choice(TASK_WORDS))
+
+    async def tasks_analyze(self, uid):
+        return await self.client.post("/tasks/analyze", json={"text": self.analyze_input()})
+
+    async def tasks_analyze_batch(self, uid):
+        return await self.client.post("/tasks/analyze/batch", json={"texts": [self.analyze_input() for _ in range(10)]})
+
+    async def memos_get(self, uid):
+        return await self.client.get("/memos/", params={"uid": uid})
+
+    async def memos_patch(self, uid):
+        memo_id = f"m{self.rng.randrange(max(1, self.args.memos_per_user))}"
+        body = {"base_version": self.memo_versions[uid],
+                "ops": [{"op": "check", "id": memo_id, "checked": self.rng.random() < 0.5}]}
+        resp = await self.client.patch("/memos/", params={"uid": uid}, json=body)
+        if resp.status_code == 200:
+            self.memo_versions[uid] = int(resp.headers.get("X-Memos-Version", self.memo_versions[uid]))
+        elif resp.status_code == 409:
+            # Another simulated tab won; adopt its version like the frontend does
+            self.memo_versions[uid] = resp.json()["detail"]["version"]
+        return resp
+
+    async def events_list(self, uid):
+        start = date.today() + timedelta(days=self.rng.randrange(-30, 60))
+        return await self.client.get("/schedule/", params={
+            "from": start.isoformat(), "to": (start + timedelta(days=14)).isoformat(),
+        })
+
+    async def schedule_upload(self, uid):
+        workbook = make_workbook(self.rng, self.args.upload_rows, date.today())
+        return await self.client.post("/schedule/upload", files={"file": (f"{uuid.uuid4().hex[:8]}.xlsx", workbook)})
+
+    async def run(self, total: int, concurrency: int) -> dict:
+        plan = [(self.rng.choices(self.scenarios, self.weights)[0], self.rng.choice(self.users)) for _ in range(total)]
+        samples = {name: [] for name in self.scenarios}
+        statuses = {}
+        queue = iter(plan)
+
+        async def worker():
+            for name, uid in queue:
+                started = time.perf_counter()
+                try:
+                    resp = await getattr(self, name)(uid)
+                    status = resp.status_code
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                samples[name].append(time.perf_counter() - started)
+                statuses.setdefault(name, {}).setdefault(str(status), 0)
+                statuses[name][str(status)] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        scenarios = {name: summarize(latencies, elapsed) | {"status": statuses.get(name, {})}
+                     for name, latencies in samples.items() if latencies}
+        every = [s for latencies in samples.values() for s in latencies]
+        # 409 on memos is an expected outcome of concurrent edits, not an error
+        errors = sum(n for name, counts in statuses.items() for code, n in counts.items()
+                     if not (code.isdigit() and (int(code) < 400 or (code == "409" and name == "memos_patch"))))
+        return {"concurrency": concurrency, "errors": errors, **summarize(every, elapsed), "scenarios": scenarios}
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(latencies: list, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+def parse_mix(value: str) -> dict:
+    """"tasks_list=5,briefing=1" -> {"tasks_list": 5, "briefing": 1}"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise SystemExit(f"Unknown scenario: {name} (choose from {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def compare(report: dict, baseline: dict, max_regression: float, floor_ms: float) -> list:
+    """Scenarios whose p95 regressed by more than `max_regression` (and at least `floor_ms`) vs the baseline."""
+    regressions = []
+    previous = {run["concurrency"]: run for run in baseline.get("runs", [])}
+    for run in report["runs"]:
+        before = previous.get(run["concurrency"])
+        if not before:
+            continue
+        for name, current in run["scenarios"].items():
+            old = before["scenarios"].get(name)
+            if not old:
+                continue
+            limit = max(old["p95_ms"] * (1 + max_regression), old["p95_ms"] + floor_ms)
+            if current["p95_ms"] > limit:
+                regressions.append({
+                    "concurrency": run["concurrency"], "scenario": name,
+                    "baseline_p95_ms": old["p95_ms"], "p95_ms": current["p95_ms"],
+                })
+    return regressions
+
+
+def use_store(store: str, db_latency: float):
+    """Points the app's get_db() at the chosen data store."""
+    from backend.services.firebase import db_service
+    if store == "demo":
+        from backend.services.store import demo_store
+        demo_store.clear()
+        db_service.db = None
+    elif store == "fake":
+        from backend.benchmarks.fake_firestore import use_fake_firestore
+        use_fake_firestore(latency=db_latency)
+    elif store == "sqlite":
+        from backend.services.sqlite_db import SQLiteFirestore
+        db_service.db = SQLiteFirestore(os.path.join(tempfile.mkdtemp(prefix="dashboard-bench-"), "bench.db"))
+    elif store == "emulator":
+        if not os.getenv("FIRESTORE_EMULATOR_HOST"):
+            raise SystemExit("--store emulator needs FIRESTORE_EMULATOR_HOST (e.g. localhost:8080)")
+        from google.cloud import firestore as cloud_firestore
+        db_service.db = cloud_firestore.Client(project=os.getenv("GCLOUD_PROJECT", "demo-dashboard-bench"))
+
+
+async def main(args) -> tuple[str, int]:
+    gemini = None
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+    else:
+        from backend.main import app
+        from backend.services.gemini import gemini_service
+
+        gemini = FakeGeminiServer(latency=args.gemini_latency, respond=plausible_response)
+        await gemini.start()
+        gemini_service.api_key = "bench"
+        gemini_service.base_url = gemini.base_url
+        # The stub speaks HTTP/1.1 only
+        gemini_service.http2 = False
+        await gemini_service.startup()
+        use_store(args.store, args.db_latency)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "runs": [],
+    }
+    try:
+        test = LoadTest(client, args)
+        await test.seed()
+        if args.warmup:
+            await test.run(args.warmup, max(args.concurrency))
+        for concurrency in args.concurrency:
+            upstream_before = gemini.requests if gemini else None
+            run = await test.run(args.requests, concurrency)
+            if gemini:
+                run["gemini_upstream_requests"] = gemini.requests - upstream_before
+            report["runs"].append(run)
+    finally:
+        await client.aclose()
+        if gemini:
+            from backend.services.gemini import gemini_service
+            await gemini_service.shutdown()
+            await gemini.stop()
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(report, json.load(f), args.max_regression, args.regression_floor_ms)
+        status = 1 if report["regressions"] else 0
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    return output, status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", choices=["demo", "fake", "sqlite", "emulator"], default="fake")
+    parser.add_argument("--db-latency", type=float, default=0.005, help="fake Firestore seconds per call")
+    parser.add_argument("--gemini-latency", type=float, default=0.2, help="fake Gemini seconds per request")
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    parser.add_argument("--concurrency", type=lambda v: [int(c) for c in v.split(",")], default=[1, 10, 50],
+                        help="comma-separated levels, e.g. 1,10,50")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests before the first level")
+    parser.add_argument("--mix", help='scenario weights, e.g. "tasks_list=5,briefing=1" (default: a realistic mix)')
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks-per-user", type=int, default=30)
+    parser.add_argument("--memos-per-user", type=int, default=10)
+    parser.add_argument("--events", type=int, default=500, help="events seeded via one schedule upload")
+    parser.add_argument("--upload-rows", type=int, default=40, help="rows per schedule_upload workbook")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare p95 latencies against")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p95 slowdown (0.25 = 25%%)")
+    parser.add_argument("--regression-floor-ms", type=float, default=2.0,
+                        help="ignore p95 differences smaller than this")
+    # The app's DEBUG prints go to stderr so stdout is just the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        report, status = asyncio.run(main(parser.parse_args()))
+    print(report)
+    sys.exit(status)
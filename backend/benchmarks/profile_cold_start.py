@@ -0,0 +1,126 @@
+"""
+Cold-start profile of the serverless entry point.
+
+Each run starts a fresh interpreter (like a new Vercel instance), imports the
+entry module with `-X importtime`, then serves one request in-process
+(lifespan events are not run; serverless runtimes may skip them too). Reports
+as JSON: median process, import and first-response times, the slowest imports
+(per package and backend module) and which heavy dependencies got loaded.
+
+    python -m backend.benchmarks.profile_cold_start
+    python -m backend.benchmarks.profile_cold_start --path /tasks/ --runs 10
+    python -m backend.benchmarks.profile_cold_start --budget-ms 800   # exit 1 if slower
+
+No credentials are needed; without them the app runs in demo mode.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# Dependencies that should only load when a request needs them
+HEAVY_MODULES = ["firebase_admin", "google.cloud.firestore", "openpyxl", "pandas", "h2"]
+
+_MARKER = "COLD_START_RESULT "
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$")
+
+# Runs in the child interpreter
+_CHILD = """
+import asyncio, importlib, json, sys, time
+started = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+
+async def first_request():
+    import httpx
+    transport = httpx.ASGITransport(app=module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold") as client:
+        return (await client.get({path!r})).status_code
+
+status = asyncio.run(first_request())
+done = time.perf_counter()
+print({marker!r} + json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "first_response_ms": (done - imported) * 1000,
+    "status": status,
+    "heavy_loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """[(module, cumulative_us)] from `-X importtime` output."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if m:
+            rows.append((m.group(3), int(m.group(2))))
+    return rows
+
+
+def run_once(module: str, path: str) -> dict:
+    code = _CHILD.format(module=module, path=path, marker=_MARKER, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=os.getcwd())
+    wall_ms = (time.perf_counter() - started) * 1000
+    result_line = next((l for l in proc.stdout.splitlines() if l.startswith(_MARKER)), None)
+    if proc.returncode != 0 or result_line is None:
+        raise SystemExit(f"Cold-start run failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(result_line[len(_MARKER):])
+    result["process_ms"] = wall_ms
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main(args) -> int:
+    runs = [run_once(args.module, args.path) for _ in range(args.runs)]
+
+    # Slowest imports per third-party package and per backend module, median across runs
+    entry = {args.module, "api", "backend.main"}
+    per_module = {}
+    for run in runs:
+        costs = {}
+        for name, cumulative_us in run["imports"]:
+            key = name if name.startswith("backend.") else name.split(".")[0]
+            if key not in entry:
+                costs[key] = max(costs.get(key, 0), cumulative_us / 1000)
+        for key, ms in costs.items():
+            per_module.setdefault(key, []).append(ms)
+    slowest = sorted(((name, statistics.median(v)) for name, v in per_module.items()),
+                     key=lambda item: item[1], reverse=True)[:args.top]
+
+    median = lambda key: round(statistics.median(r[key] for r in runs), 1)
+    report = {
+        "module": args.module,
+        "path": args.path,
+        "runs": args.runs,
+        "status": runs[-1]["status"],
+        "process_ms": median("process_ms"),
+        "import_ms": median("import_ms"),
+        "first_response_ms": median("first_response_ms"),
+        "heavy_loaded": runs[-1]["heavy_loaded"],
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest},
+    }
+    status = 0
+    if args.budget_ms is not None:
+        cold_ms = report["import_ms"] + report["first_response_ms"]
+        report["budget_ms"] = args.budget_ms
+        report["within_budget"] = cold_ms <= args.budget_ms
+        status = 0 if report["within_budget"] else 1
+    print(json.dumps(report, indent=2))
+    return status
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="api.index", help="entry module exposing `app`")
+    parser.add_argument("--path", default="/health", help="first request to serve")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="how many slow imports to list")
+    parser.add_argument("--budget-ms", type=float, help="fail if import + first response is slower")
+    sys.exit(main(parser.parse_args()))
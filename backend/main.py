@@ -6,14 +6,33 @@ env_path = os.path.join(os.path.dirname(__file__), ".env")
 if os.path.exists(env_path):
     load_dotenv(env_path)
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from backend.routers import tasks, briefing, schedule, memos
+from backend.services.gemini import gemini_service
+from backend.services.serialization import FastJSONResponse
+from backend.services import metrics
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The pooled Gemini client (~0.15s to set up TLS) and the Firestore client
+    # are created on first use, so cold starts for light requests skip both
+    briefing.briefing_scheduler.start()
+    yield
+    await briefing.briefing_scheduler.stop()
+    await gemini_service.shutdown()
 
 app = FastAPI(
     title="Head Teacher Dashboard API",
     docs_url="/docs",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan,
+    # orjson-backed JSON for every endpoint (JSON_ENCODER=json to switch back)
+    default_response_class=FastJSONResponse,
 )
 
 # Debug endpoints removed for security
@@ -36,8 +55,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Memos-Version", "ETag"],
 )
 
+# Response compression: "auto" (Brotli if brotli-asgi is installed, else gzip), "brotli", "gzip" or "off".
+# Bodies smaller than COMPRESSION_MIN_SIZE bytes are sent as-is; SSE streams are never compressed.
+compression = os.getenv("RESPONSE_COMPRESSION", "auto").lower()
+compression_min_size = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+if compression in ("auto", "brotli") and find_spec("brotli_asgi") is not None:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=int(os.getenv("BROTLI_QUALITY", 4)),
+        minimum_size=compression_min_size,
+        gzip_fallback=True,
+        excluded_handlers=[r"^/briefing/stream"],
+    )
+elif compression != "off":
+    # Also the fallback for "brotli" when brotli-asgi is missing
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=compression_min_size,
+        compresslevel=int(os.getenv("GZIP_LEVEL", 6)),
+    )
+
+# Outermost, so latency includes compression and CORS
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.include_router(tasks.router)
 app.include_router(briefing.router)
 app.include_router(schedule.router)
@@ -48,9 +92,10 @@ async def read_root():
     return {"message": "Head Teacher Dashboard API is running"}
 
 @app.get("/health")
-async def health_check():
+async def health_check(deep: bool = False):
+    """`deep=true` also connects to Firestore if nothing has used it yet."""
     import os
-    from backend.services.firebase import get_db
+    from backend.services.firebase import db_service
 
     status = {
         "status": "ok",
@@ -66,14 +111,26 @@ async def health_check():
         # 2. Check Gemini Service
         from backend.services.gemini import gemini_service
         status["gemini"] = "configured" if gemini_service.api_key else "not_configured"
+        status["llm_cache"] = gemini_service.cache.stats()
+        status["gemini_upstream"] = gemini_service.upstream_stats()
         # status["gemini_model"] = gemini_service.model_name # Hide detail
     else:
         status["env_loaded"] = False
         status["gemini"] = "missing_api_key"
 
-    # 3. Check Firebase
+    from backend.services.briefing_cache import briefing_cache
+    status["briefing_cache"] = briefing_cache.stats()
+    from backend.services.etag import etag_cache
+    status["etag_cache"] = etag_cache.stats()
+    from backend.services.single_flight import flights
+    status["single_flight"] = {name: flight.stats() for name, flight in flights.items()}
+
+    # 3. Check Firebase (without paying for its client on a cold instance)
+    if not db_service.initialized and not deep:
+        status["firebase"] = "not_loaded"
+        return status
     try:
-        db = get_db()
+        db = db_service.db
         if db:
             status["firebase"] = "connected"
         else:
@@ -82,3 +139,43 @@ async def health_check():
         status["firebase"] = "error" # Hide detail
 
     return status
+
+
+def collect_cache_metrics() -> list:
+    """The caches' own counters, read at scrape time."""
+    from backend.services.briefing_cache import briefing_cache
+    from backend.services.etag import etag_cache
+    from backend.services.single_flight import flights
+
+    llm = gemini_service.cache.stats()
+    briefing_stats = briefing_cache.stats()
+    etag = etag_cache.stats()
+    caches = {
+        "llm": (llm["hits"] + llm["disk_hits"], llm["misses"], llm["entries"]),
+        "briefing": (briefing_stats["hits"], briefing_stats["misses"], briefing_stats["entries"]),
+        # A 304 is an ETag hit; a full body is a miss
+        "etag": (etag["not_modified_cached"] + etag["not_modified_read"], etag["full"], etag["entries"]),
+    }
+    breaker = gemini_service.breaker.stats()
+    return [
+        ("cache_hits_total", "counter", "Cache hits.", [({"cache": k}, v[0]) for k, v in caches.items()]),
+        ("cache_misses_total", "counter", "Cache misses.", [({"cache": k}, v[1]) for k, v in caches.items()]),
+        ("cache_hit_ratio", "gauge", "Hits / lookups since start.",
+         [({"cache": k}, round(v[0] / (v[0] + v[1]), 4) if v[0] + v[1] else 0.0) for k, v in caches.items()]),
+        ("cache_entries", "gauge", "Entries currently cached.", [({"cache": k}, v[2]) for k, v in caches.items()]),
+        ("single_flight_coalesced_total", "counter", "Calls that joined an in-flight computation.",
+         [({"flight": name}, f.coalesced) for name, f in flights.items()]),
+        ("gemini_circuit_open", "gauge", "1 while the Gemini circuit breaker is open.",
+         [({}, int(breaker["state"] == "open"))]),
+        ("gemini_limiter_waiting", "gauge", "Gemini calls waiting for a concurrency slot.",
+         [({}, gemini_service.upstream_stats()["concurrency"]["waiting"])]),
+    ]
+
+metrics.registry.add_collector(collect_cache_metrics)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition format."""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,41 +1,38 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from backend.services.gemini import gemini_service
-from backend.services.firebase import get_db
-from datetime import datetime, timedelta
+from backend.services.firebase import get_db, run_db
+from backend.services.briefing_cache import briefing_cache
+from backend.services.briefing_scheduler import BriefingScheduler
+from backend.services.event_index import event_index
+from backend.services.single_flight import SingleFlight
+from backend.services.prompt_builder import PromptBuilder
+from datetime import datetime
+import asyncio
+import json
+import os
 
 router = APIRouter(prefix="/briefing", tags=["briefing"])
 
-# In-memory cache for briefing
-briefing_cache = {
-    "date": None,
-    "content": None,
-    "uid": None
-}
+# Estimated prompt tokens per briefing; lower-priority sections are cut first
+BRIEFING_PROMPT_TOKENS = int(os.getenv("BRIEFING_PROMPT_TOKENS", 3000))
+PRIORITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
 
-@router.get("/")
-async def get_briefing(uid: str = "default_user", force_refresh: bool = False):
-    global briefing_cache
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    
-    # 1. Check Cache
-    if not force_refresh and briefing_cache["date"] == today_str and briefing_cache["uid"] == uid and briefing_cache["content"]:
-        return {"briefing": briefing_cache["content"]}
+# Users who asked for a briefing since startup (pre-generation targets, along with DB owners)
+recent_uids = set()
+
+# Concurrent generations for the same (uid, date) share one run:
+# several tabs at 8:00, double-clicked refresh, a pre-generation already running
+briefing_flight = SingleFlight("briefing")
 
+async def build_briefing_prompt(uid: str, today_str: str) -> str:
+    """
+    Collects the user's tasks, events and memos and renders the briefing prompt.
+    """
     # 2. Init Dates
     today_date = datetime.now().date()
-    tomorrow_date = today_date + timedelta(days=1)
-    
-    # This week end (Sunday)
-    # weekday: Mon=0, Sun=6. Days to add = 6 - weekday
-    days_to_sunday = 6 - today_date.weekday()
-    this_week_end = today_date + timedelta(days=days_to_sunday)
-    
-    # Next week
-    next_week_start = this_week_end + timedelta(days=1)
-    next_week_end = next_week_start + timedelta(days=6)
 
     tasks = []
-    all_events = []
     memos = []
 
     # 3. Fetch Data
@@ -43,54 +40,38 @@ async def get_briefing(uid: str = "default_user", force_refresh: bool = False):
     if db:
         try:
             # Tasks
-            tasks_ref = db.collection("tasks").where("uid", "==", uid).where("is_deleted", "==", False).where("is_completed", "==", False).stream()
-            tasks = [t.to_dict() for t in tasks_ref]
-            
-            # Events (Fetch all future events roughly, or logic to fetch >= today)
-            # Firebase filtering by string range works for YYYY-MM-DD
-            events_ref = db.collection("events").where("date", ">=", today_str).stream()
-            all_events = [e.to_dict() for e in events_ref]
+            tasks_query = db.collection("tasks").where("uid", "==", uid).where("is_deleted", "==", False).where("is_completed", "==", False)
             
             # Memos
-            memo_doc = db.collection("memos").document(uid).get()
+            memo_ref = db.collection("memos").document(uid)
+
+            # Events come from the date index; the reads are independent, so run them concurrently
+            tasks, memo_doc, _ = await asyncio.gather(
+                run_db(lambda: [t.to_dict() for t in tasks_query.stream()], collection="tasks"),
+                run_db(memo_ref.get, collection="memos"),
+                event_index.ensure_loaded(),
+            )
             if memo_doc.exists:
                 memos = memo_doc.to_dict().get("items", [])
         except Exception as e:
             print(f"Error fetching data from DB: {e}")
             # Fallback to demo
-            from backend.services.store import demo_tasks, demo_events, demo_memos
-            tasks = demo_tasks
-            all_events = demo_events
-            memos = demo_memos
+            from backend.services.store import demo_store
+            tasks = demo_store.list_tasks(uid)
+            memos = demo_store.get_memos(uid)[0]
     else:
         # Demo Mode
-        from backend.services.store import demo_tasks, demo_events, demo_memos
-        tasks = demo_tasks
-        all_events = demo_events
-        memos = demo_memos
-
-    # 4. Filter and Bucket Events & Tasks
-    today_events = []
-    tomorrow_events = []
-    this_week_events = []
-    next_week_events = []
-
-    for e in all_events:
-        try:
-            e_date = datetime.strptime(e.get('date'), "%Y-%m-%d").date()
-            if e_date < today_date:
-                continue
-                
-            if e_date == today_date:
-                today_events.append(e)
-            elif e_date == tomorrow_date:
-                tomorrow_events.append(e)
-            elif today_date < e_date <= this_week_end:
-                this_week_events.append(e)
-            elif next_week_start <= e_date <= next_week_end:
-                next_week_events.append(e)
-        except:
-            continue
+        from backend.services.store import demo_store
+        tasks = demo_store.list_tasks(uid)
+        memos = demo_store.get_memos(uid)[0]
+        await event_index.ensure_loaded()
+
+    # 4. Bucket Events (date index, already ordered by date and time) & Tasks
+    buckets = event_index.buckets(today_date)
+    today_events = buckets["today"]
+    tomorrow_events = buckets["tomorrow"]
+    this_week_events = buckets["this_week"]
+    next_week_events = buckets["next_week"]
 
     # Bucket Tasks
     overdue_tasks = []
@@ -98,6 +79,8 @@ async def get_briefing(uid: str = "default_user", force_refresh: bool = False):
     upcoming_tasks = []
     no_date_tasks = []
 
+    # Oldest deadline first, then by priority, so truncation below is deterministic
+    tasks = sorted(tasks, key=lambda t: (str(t.get('due_date') or ''), PRIORITY_ORDER.get(t.get('priority'), 1), str(t.get('content') or '')))
     for t in tasks:
         due = t.get('due_date')
         content = t.get('content')
@@ -126,49 +109,29 @@ async def get_briefing(uid: str = "default_user", force_refresh: bool = False):
         except:
              no_date_tasks.append(f"- {content} (P: {prio})")
 
-    # Sort
-    today_events.sort(key=lambda x: x.get('time', '00:00'))
-    tomorrow_events.sort(key=lambda x: x.get('time', '00:00'))
-    this_week_events.sort(key=lambda x: x.get('date'))
-    next_week_events.sort(key=lambda x: x.get('date'))
+    def fmt_event(e):
+        return f"- [{e.get('date')}] {e.get('time', 'All Day')} {e.get('title')} ({e.get('location', '')})"
 
-    # Helper format
     def fmt_events(evts):
-        if not evts: return "일정 없음"
-        return "\n".join([f"- [{e.get('date')}] {e.get('time', 'All Day')} {e.get('title')} ({e.get('location', '')})" for e in evts])
+        return [fmt_event(e) for e in evts]
 
-    # 5. Generate Prompt
-    prompt = f"""
+    # 5. Generate Prompt: sections are filled in priority order within the token budget,
+    # so a long next-week schedule can't crowd out overdue work
+    builder = PromptBuilder("briefing", BRIEFING_PROMPT_TOKENS)
+    builder.text(f"""
     Current Date: {today_str} ({today_date.strftime('%A')})
     User: Head Teacher
-
-    [Overdue Tasks] (Must be addressed)
-    {chr(10).join(overdue_tasks) or "None"}
-
-    [Today's Tasks] (Due Today)
-    {chr(10).join(today_tasks_list) or "None"}
-    
-    [Upcoming Tasks]
-    {chr(10).join(upcoming_tasks[:5]) or "None"}
-
-    [General Tasks]
-    {chr(10).join(no_date_tasks[:5]) or "None"}
-
-    [Today's Schedule ({today_str})]
-    {fmt_events(today_events)}
-
-    [Tomorrow's Schedule]
-    {fmt_events(tomorrow_events)}
-
-    [Rest of This Week]
-    {fmt_events(this_week_events)}
-
-    [Next Week]
-    {fmt_events(next_week_events)}
-
-    [Memos]
-    {chr(10).join([f"- {m.get('text')}" for m in memos if not m.get('checked')]) or "No memos."}
-
+    """)
+    builder.section("overdue", "[Overdue Tasks] (Must be addressed)", overdue_tasks, priority=1)
+    builder.section("today_tasks", "[Today's Tasks] (Due Today)", today_tasks_list, priority=2)
+    builder.section("upcoming_tasks", "[Upcoming Tasks]", upcoming_tasks[:5], priority=5)
+    builder.section("general_tasks", "[General Tasks]", no_date_tasks[:5], priority=7)
+    builder.section("today_schedule", f"[Today's Schedule ({today_str})]", fmt_events(today_events), priority=3, empty="일정 없음")
+    builder.section("tomorrow_schedule", "[Tomorrow's Schedule]", fmt_events(tomorrow_events), priority=4, empty="일정 없음")
+    builder.section("this_week", "[Rest of This Week]", fmt_events(this_week_events), priority=6, empty="일정 없음")
+    builder.section("next_week", "[Next Week]", fmt_events(next_week_events), priority=9, empty="일정 없음")
+    builder.section("memos", "[Memos]", [f"- {m.get('text')}" for m in memos if not m.get('checked')], priority=8, empty="No memos.")
+    builder.text("""
     System Prompt:
     당신은 학교 교무부장의 유능한 비서입니다. 위 정보를 바탕으로 브리핑을 작성하세요.
     
@@ -198,18 +161,130 @@ async def get_briefing(uid: str = "default_user", force_refresh: bool = False):
     1. 날짜가 없는 섹션은 "일정 없음"으로 표시.
     2. 할 일 목록 중 날짜가 명시된 것은 해당 날짜 또는 '오늘의 중점'에 반영.
     3. 정중한 격식체(하십시오체) 사용.
-    """
+    """)
+    return builder.build()
+
+async def _generate_briefing(uid: str, today_str: str) -> str:
+    generation = briefing_cache.generation(uid)
+    prompt = await build_briefing_prompt(uid, today_str)
+    briefing_text = await gemini_service.generate_content(prompt)
+    if not briefing_text.startswith("Error:"):
+        briefing_cache.set(uid, today_str, briefing_text, generation)
+    return briefing_text
+
+async def _stream_briefing(uid: str, today_str: str, publish) -> str:
+    generation = briefing_cache.generation(uid)
+    prompt = await build_briefing_prompt(uid, today_str)
+    parts = []
+    async for chunk in gemini_service.stream_content(prompt):
+        parts.append(chunk)
+        publish(chunk)
+    briefing_text = "".join(parts)
+    # Cache only complete briefings
+    briefing_cache.set(uid, today_str, briefing_text, generation)
+    return briefing_text
+
+async def generate_briefing(uid: str, today_str: str) -> str:
+    """Generates a fresh briefing and caches it (failures are returned but not kept)."""
+    return await briefing_flight.do((uid, today_str), lambda: _generate_briefing(uid, today_str))
+
+async def list_active_uids() -> list:
+    uids = set(recent_uids)
+    db = get_db()
+    if db:
+        try:
+            task_docs = await run_db(lambda: list(db.collection("tasks").where("is_deleted", "==", False).select(["uid"]).stream()), collection="tasks")
+            for doc in task_docs:
+                uid = doc.to_dict().get("uid")
+                if uid:
+                    uids.add(uid)
+            memo_refs = await run_db(lambda: list(db.collection("memos").list_documents()), collection="memos", op="list")
+            for ref in memo_refs:
+                uids.add(ref.id)
+        except Exception as e:
+            print(f"Error listing active users: {e}")
+    else:
+        from backend.services.store import demo_store
+        uids.update(demo_store.task_uids())
+        uids.update(demo_store.memo_uids())
+        uids.add("default_user")
+    return sorted(uids)
+
+briefing_scheduler = BriefingScheduler(
+    generate=generate_briefing,
+    is_cached=briefing_cache.contains,
+    list_uids=list_active_uids,
+)
+
+@router.get("/")
+async def get_briefing(uid: str = "default_user", force_refresh: bool = False):
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    recent_uids.add(uid)
+
+    # 1. Check Cache
+    if not force_refresh:
+        cached = briefing_cache.get(uid, today_str)
+        if cached:
+            return {"briefing": cached}
 
     try:
-        briefing_text = await gemini_service.generate_content(prompt)
-        
-        # Cache
-        briefing_cache["date"] = today_str
-        briefing_cache["content"] = briefing_text
-        briefing_cache["uid"] = uid
-        
+        briefing_text = await generate_briefing(uid, today_str)
         return {"briefing": briefing_text}
         
     except Exception as e:
          print(f"Error generating briefing: {e}")
          raise HTTPException(status_code=500, detail=f"Failed to generate briefing: {e}")
+
+def _sse(data: dict, event: str | None = None) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.get("/stream")
+async def stream_briefing(uid: str = "default_user", force_refresh: bool = False):
+    """
+    Same briefing as GET /briefing/, streamed as Server-Sent Events.
+    Emits `data: {"text": ...}` chunks, then `event: done` (or `event: error`).
+    """
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    recent_uids.add(uid)
+
+    cached = None if force_refresh else briefing_cache.get(uid, today_str)
+
+    async def events():
+        if cached:
+            yield _sse({"text": cached})
+            yield _sse({"cached": True}, event="done")
+            return
+
+        # Concurrent streams (and GET /briefing/ calls) share one generation
+        first = True
+        try:
+            async for chunk in briefing_flight.stream((uid, today_str), lambda publish: _stream_briefing(uid, today_str, publish)):
+                if first and chunk.startswith("Error:"):
+                    # Joined a non-streamed generation that failed
+                    yield _sse({"detail": f"Failed to generate briefing: {chunk}"}, event="error")
+                    return
+                first = False
+                yield _sse({"text": chunk})
+        except Exception as e:
+            print(f"Error streaming briefing: {e}")
+            yield _sse({"detail": f"Failed to generate briefing: {e}"}, event="error")
+            return
+
+        yield _sse({"cached": False}, event="done")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/pregen/status")
+async def pregen_status():
+    """State of the scheduled briefing pre-generation and its last run."""
+    return briefing_scheduler.status
+
+@router.post("/pregen/run")
+async def pregen_run():
+    """Runs pre-generation now (e.g. from an external cron on serverless hosts)."""
+    return await briefing_scheduler.run_once()
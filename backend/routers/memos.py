@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
-from backend.services.firebase import get_db
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from backend.services.firebase import get_db, run_db, run_transaction
+from backend.services.briefing_cache import briefing_cache
+from backend.services.etag import etag_cache
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 router = APIRouter(prefix="/memos", tags=["memos"])
 
+# Current version of a user's memo list, sent with GET and every save
+VERSION_HEADER = "X-Memos-Version"
+
 class MemoItem(BaseModel):
     id: str
     text: str
@@ -14,40 +19,153 @@ class MemoItem(BaseModel):
 # Actually `bool` is correct python type.
 class MemoRequest(BaseModel):
     items: List[dict] # Simply accept list of dicts to match frontend structure
+    base_version: Optional[int] = None # If given, the save is rejected with 409 when stale
 
-@router.get("/")
-async def get_memos(uid: str = "default_user"):
+class MemoOp(BaseModel):
+    op: Literal["add", "update", "check", "delete"]
+    id: str
+    text: Optional[str] = None # add / update
+    checked: Optional[bool] = None # add / check
+
+class MemoPatchRequest(BaseModel):
+    base_version: int
+    ops: List[MemoOp]
+
+class MemoVersionConflict(Exception):
+    def __init__(self, version: int, items: list):
+        self.version = version
+        self.items = items
+
+def apply_memo_ops(items: list, ops: List[MemoOp]) -> list:
+    """Applies add / update / check / delete by item id. Ops on unknown ids are ignored."""
+    items = [dict(item) for item in items]
+    index = {item.get("id"): item for item in items}
+    for op in ops:
+        item = index.get(op.id)
+        if op.op == "add":
+            if item is None:
+                item = {"id": op.id, "text": op.text or "", "checked": bool(op.checked)}
+                items.append(item)
+                index[op.id] = item
+        elif item is None:
+            continue
+        elif op.op == "update":
+            if op.text is not None:
+                item["text"] = op.text
+        elif op.op == "check":
+            item["checked"] = bool(op.checked)
+        elif op.op == "delete":
+            items.remove(item)
+            del index[op.id]
+    return items
+
+def raise_conflict(e: MemoVersionConflict):
+    raise HTTPException(status_code=409, detail={
+        "message": "Memos were changed elsewhere; reload and retry.",
+        "version": e.version,
+        "items": e.items,
+    })
+
+async def write_memos(db, uid: str, mutate, base_version: int | None) -> tuple[list, int]:
+    """
+    Read-check-write of memos/{uid} in one transaction: verifies `base_version`
+    (if given), stores mutate(items) and bumps the version. Returns (items, new version).
+    """
+    doc_ref = db.collection("memos").document(uid)
+
+    def apply(transaction):
+        snap = doc_ref.get(transaction=transaction)
+        data = snap.to_dict() if snap.exists else {}
+        version = data.get("version", 0)
+        items = data.get("items", [])
+        if base_version is not None and base_version != version:
+            raise MemoVersionConflict(version, items)
+        new_items = mutate(items)
+        transaction.set(doc_ref, {"items": new_items, "version": version + 1})
+        return new_items, version + 1
+
+    return await run_db(run_transaction, db, apply, collection="memos", op="transaction")
+
+def write_demo_memos(uid: str, mutate, base_version: int | None) -> tuple[list, int]:
+    from backend.services.store import demo_store
+
+    def apply(items, version):
+        if base_version is not None and base_version != version:
+            raise MemoVersionConflict(version, items)
+        return mutate(items)
+
+    return demo_store.update_memos(uid, apply)
+
+async def load_memos(uid: str, headers: dict) -> list:
     db = get_db()
     if db:
         try:
             # Assuming single doc for user's memo list for simplicity, or collection of items
             # For "Simple Memo", a single document containing the list is easier to sync than meaningful individual docs
             doc_ref = db.collection("memos").document(uid)
-            doc = doc_ref.get()
+            doc = await run_db(doc_ref.get, collection="memos")
             if doc.exists:
-                return doc.to_dict().get("items", [])
+                data = doc.to_dict()
+                headers[VERSION_HEADER] = str(data.get("version", 0))
+                return data.get("items", [])
+            headers[VERSION_HEADER] = "0"
             return []
         except Exception as e:
              print(f"DB Error: {e}")
              return []
     else:
         # Demo Mode
-        from backend.services.store import demo_memos
-        return demo_memos
+        from backend.services.store import demo_store
+        items, version = demo_store.get_memos(uid)
+        headers[VERSION_HEADER] = str(version)
+        return items
+
+@router.get("/")
+async def get_memos(request: Request, uid: str = "default_user"):
+    headers = {}
+    return await etag_cache.respond(request, ("memos", uid), lambda: load_memos(uid, headers), headers)
 
 @router.post("/")
-async def save_memos(request: MemoRequest, uid: str = "default_user"):
+async def save_memos(request: MemoRequest, response: Response, uid: str = "default_user"):
+    """Replaces the whole memo list."""
     db = get_db()
-    if db:
-        try:
-            doc_ref = db.collection("memos").document(uid)
-            doc_ref.set({"items": request.items})
-            return {"message": "Saved"}
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
-    else:
-        # Demo Mode
-        from backend.services.store import demo_memos
-        demo_memos.clear()
-        demo_memos.extend(request.items)
-        return {"message": "Saved to Demo Store"}
+    try:
+        if db:
+            _, version = await write_memos(db, uid, lambda _: request.items, request.base_version)
+            message = "Saved"
+        else:
+            # Demo Mode
+            _, version = write_demo_memos(uid, lambda _: request.items, request.base_version)
+            message = "Saved to Demo Store"
+    except MemoVersionConflict as e:
+        raise_conflict(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    briefing_cache.invalidate_user(uid)
+    etag_cache.bump(("memos", uid))
+    response.headers[VERSION_HEADER] = str(version)
+    return {"message": message, "version": version}
+
+@router.patch("/")
+async def patch_memos(request: MemoPatchRequest, response: Response, uid: str = "default_user"):
+    """
+    Applies only the changed items (add / update / check / delete by id) on top of
+    `base_version`. Answers 409 with the current items and version if it is stale.
+    """
+    db = get_db()
+    mutate = lambda items: apply_memo_ops(items, request.ops)
+    try:
+        if db:
+            _, version = await write_memos(db, uid, mutate, request.base_version)
+        else:
+            _, version = write_demo_memos(uid, mutate, request.base_version)
+    except MemoVersionConflict as e:
+        raise_conflict(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    briefing_cache.invalidate_user(uid)
+    etag_cache.bump(("memos", uid))
+    response.headers[VERSION_HEADER] = str(version)
+    return {"message": "Saved", "version": version}
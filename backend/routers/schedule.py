@@ -1,75 +1,333 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from backend.services.excel_processor import excel_processor
-from backend.services.firebase import get_db
+from fastapi import APIRouter, HTTPException, UploadFile, File, Query, Request, Response
+from backend.services.excel_processor import excel_processor, event_id, file_fingerprint
+from backend.services.firebase import get_db, run_db, commit_in_batches
+from backend.services.briefing_cache import briefing_cache
+from backend.services.event_index import event_index
+from backend.services.etag import etag_cache
+from datetime import datetime
+import base64
+import hashlib
+import json
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
+# Events are shared by all users, so all schedule reads share one ETag scope
+EVENTS_SCOPE = ("events",)
+
+def invalidate_briefings_for(events: list):
+    """Events are shared by all users; only upcoming ones appear in briefings."""
+    today_str = datetime.now().strftime("%Y-%m-%d")
+    if any(str(e.get("date") or "") >= today_str for e in events):
+        briefing_cache.invalidate_all()
+
+def import_source_id(filename: str) -> str:
+    # Firestore document ids can't contain "/", so key import records by a hash of the name
+    return hashlib.sha1(filename.encode("utf-8")).hexdigest()[:20]
+
+async def load_import_record(db, filename: str, file_hash: str) -> tuple[dict | None, bool]:
+    """
+    Returns (previous import record for this file name, whether identical content was already imported).
+    """
+    if not db:
+        from backend.services.store import demo_store
+        return demo_store.get_import(filename), demo_store.has_import_hash(file_hash)
+
+    imports = db.collection("schedule_imports")
+    doc = await run_db(imports.document(import_source_id(filename)).get, collection="schedule_imports")
+    record = doc.to_dict() if doc.exists else None
+    if record and record.get("file_hash") == file_hash:
+        return record, True
+    matches = await run_db(lambda: list(imports.where("file_hash", "==", file_hash).limit(1).stream()), collection="schedule_imports")
+    unchanged = bool(matches)
+    return record, unchanged
+
+async def save_import_record(db, filename: str, file_hash: str | None, groups: list, local_events: list,
+                             stale_events: list, event_count: int):
+    """
+    Remembers which events each part of the file produced, so a re-import can
+    remove the events of rows that changed or were deleted.
+    `file_hash` is None after a partial import, so an identical re-upload retries the failed rows.
+    `stale_events` are ids whose delete failed; the next import retries them.
+    """
+    record = {
+        "filename": filename,
+        "file_hash": file_hash,
+        "groups": groups,
+        "local_events": local_events,
+        "stale_events": stale_events,
+        "event_count": event_count,
+        "imported_at": datetime.now().isoformat(),
+    }
+    if not db:
+        from backend.services.store import demo_store
+        demo_store.save_import(filename, record)
+        return
+    await run_db(db.collection("schedule_imports").document(import_source_id(filename)).set, record, collection="schedule_imports", op="write")
+
+def stale_event_ids(record: dict | None, sources: dict, events: list, partial: bool) -> tuple[list, list]:
+    """
+    Returns (groups to record, ids of events whose source rows changed or disappeared).
+    After a partial import the stale groups are kept (their rows may be among
+    the failed ones) and replaced by the next complete import.
+    """
+    groups = sources["groups"]
+    stale = set((record or {}).get("local_events", [])) | set((record or {}).get("stale_events", []))
+    if partial:
+        groups = groups + sources["stale"]
+    else:
+        stale.update(i for g in sources["stale"] for i in g["events"])
+    keep = {e["id"] for e in events} | {i for g in groups for i in g["events"]}
+    return groups, sorted(stale - keep)
+
 @router.post("/upload")
-async def upload_schedule(file: UploadFile = File(...)):
+async def upload_schedule(response: Response, file: UploadFile = File(...)):
     print(f"DEBUG: Received file upload - {file.filename}")
     """
     Uploads an Excel file, extracts events using Gemini, and saves to Firestore.
+    Identical re-uploads short-circuit; for edited files only new/changed rows go back to Gemini.
+    Events are upserted by their (date, time, title) key; events of rows that
+    were edited or removed since the last import of the file are deleted.
+    If some chunks failed, the rest is saved and the response is 207 with
+    "partial": true; uploading the same file again retries only the failed rows.
     """
     if not file.filename.endswith(('.xlsx', '.xls')):
          print("DEBUG: Invalid file extension")
          raise HTTPException(status_code=400, detail="Invalid file type. Please upload Excel file.")
-    
+
+    db = get_db()
+    contents = await file.read()
+    file_hash = file_fingerprint(contents)
+
+    try:
+        record, unchanged = await load_import_record(db, file.filename, file_hash)
+    except Exception as e:
+        print(f"DEBUG: Import record lookup failed: {e}")
+        record, unchanged = None, False
+
+    if unchanged:
+        print("DEBUG: File unchanged since last import")
+        return {"message": "File already imported; no changes.", "events": [], "unchanged": True}
+
     try:
         # 1. Process with AI
         print("DEBUG: Processing with ExcelProcessor...")
-        events = await excel_processor.process_schedule(file)
-        print(f"DEBUG: Processed events: {events}")
+        events, report, sources = await excel_processor.process_contents(contents, record)
+        print(f"DEBUG: Processed {len(events)} events in {report['seconds']}s")
     except Exception as e:
         print(f"DEBUG: Error in excel_processor: {e}")
         raise HTTPException(status_code=500, detail=f"Processing failed: {e}")
     
-    if not events:
+    if not events and not report["skipped_rows"]:
          print("DEBUG: No events extracted")
          raise HTTPException(status_code=500, detail="Failed to extract events or empty file.")
 
-    # 2. Save to Firestore (Batch write)
+    for event in events:
+        event['id'] = event_id(event)
+    partial = report["failed_chunks"] > 0
+    # Only rows Gemini extracted count as imported
+    groups, stale_ids = stale_event_ids(record, sources, events, partial)
+    local_ids = sources["local"]
+    report["deleted_events"] = len(stale_ids)
+    import_hash = None if partial else file_hash
+    retry_note = ""
+    if partial:
+        response.status_code = 207
+        retry_note = f" {report['failed_chunks']} of {len(report['chunks'])} chunks failed; upload the file again to retry them."
+        print(f"DEBUG: {report['failed_chunks']} chunks failed; not marking the file as imported")
+
+    # 2. Save to Firestore (Batch write, upsert by natural key)
     try:
-        db = get_db()
         if not db:
             print("DEBUG: Firestore DB not initialized")
             # Demo Mode: Save to Memory
-            from backend.services.store import demo_events
-            # Assign IDs to events for deletion
-            import uuid
-            for event in events:
-                event['id'] = str(uuid.uuid4())
-                demo_events.append(event)
+            from backend.services.store import demo_store
+            demo_store.upsert_events(events)
+            removed = [e for e in (demo_store.delete_event(i) for i in stale_ids) if e]
+            await save_import_record(db, file.filename, import_hash, groups, local_ids, [], len(events))
+            event_index.upsert(events)
+            for event in removed:
+                event_index.remove(event["id"])
+            etag_cache.bump(EVENTS_SCOPE)
+            invalidate_briefings_for(events + removed)
             
-            return {"message": f"Processed and saved {len(events)} events (Demo Mode)", "events": events}
+            return {"message": f"Processed and saved {len(events)} events (Demo Mode).{retry_note}", "events": events, "report": report, "partial": partial}
             
         print("DEBUG: Saving to Firestore...")
-        batch = db.batch()
         collection = db.collection("events")
-        
-        count = 0
-        for event in events:
-            doc_ref = collection.document() # Auto-ID
-            batch.set(doc_ref, event)
-            count += 1
-            
-        batch.commit()
-        print(f"DEBUG: Successfully saved {count} events")
-        return {"message": f"Successfully processed and saved {count} events.", "events": events}
+        writes = [("set", collection.document(event['id']), event) for event in events]
+        batches = await commit_in_batches(db, writes, collection="events")
+        report["batches"] = batches
+
+        saved = [e for b in batches if b["ok"] for e in events[b["start"]:b["start"] + b["writes"]]]
+        count = len(saved)
+        event_index.upsert(saved)
+        etag_cache.bump(EVENTS_SCOPE)
+        invalidate_briefings_for(saved)
+
+        failed = [b for b in batches if not b["ok"]]
+        if failed:
+            # Not recording the import lets a re-upload retry everything (writes are upserts)
+            print(f"DEBUG: {len(failed)} of {len(batches)} batches failed")
+            raise HTTPException(status_code=500, detail={
+                "message": f"Saved {count} of {len(events)} events; {len(failed)} batches failed.",
+                "batches": batches,
+            })
+
+        # Events of edited or removed rows go only after the new ones are saved
+        deletes = [("delete", collection.document(i), None) for i in stale_ids]
+        delete_batches = await commit_in_batches(db, deletes, collection="events") if deletes else []
+        deleted = [i for b in delete_batches if b["ok"] for i in stale_ids[b["start"]:b["start"] + b["writes"]]]
+        for i in deleted:
+            event_index.remove(i)
+        if deleted:
+            etag_cache.bump(EVENTS_SCOPE)
+            # The deleted events' dates are not read back
+            briefing_cache.invalidate_all()
+        report["deleted_events"] = len(deleted)
+        undeleted = sorted(set(stale_ids) - set(deleted))
+
+        await save_import_record(db, file.filename, import_hash, groups, local_ids, undeleted, count)
+        print(f"DEBUG: Successfully saved {count} events in {len(batches)} batches")
+        return {"message": f"Successfully processed and saved {count} events.{retry_note}", "events": events, "report": report, "partial": partial}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"DEBUG: Firestore save failed: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to save to database: {e}")
 
+EVENT_FIELDS = {"id", "title", "date", "time", "location", "participants", "manager", "type", "note"}
+MAX_PAGE_SIZE = 500
+
+def parse_fields(fields: str | None) -> list | None:
+    if not fields:
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in EVENT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+def project(event: dict, fields: list | None) -> dict:
+    if fields is None:
+        return event
+    return {f: event[f] for f in fields if f in event}
+
+def encode_cursor(event: dict) -> str:
+    raw = json.dumps([event.get("date"), event.get("id")]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        date_value, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(date_value), str(doc_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def date_range_query(db, date_from: str | None, date_to: str | None):
+    query = db.collection("events")
+    if date_from:
+        query = query.where("date", ">=", date_from)
+    if date_to:
+        query = query.where("date", "<=", date_to)
+    return query
+
+async def fetch_event_range(db, date_from: str | None, date_to: str | None, fields: list | None) -> list:
+    """
+    Events in [date_from, date_to] read with a Firestore range query and
+    field mask, ordered by date then time like the in-process index.
+    """
+    query = date_range_query(db, date_from, date_to).order_by("date")
+    if fields is not None:
+        # "date" and "time" are always read for the ordering
+        query = query.select(sorted((set(fields) - {"id"}) | {"date", "time"}))
+    events = await run_db(lambda: [{**doc.to_dict(), "id": doc.id} for doc in query.stream()], collection="events")
+    return sorted(events, key=lambda e: (str(e.get("date") or ""), str(e.get("time") or "")))
+
+async def fetch_event_page(db, date_from, date_to, page_size: int, cursor: str | None, fields: list | None) -> list:
+    """
+    One page of events ordered by (date, document id), read with a Firestore
+    range query, limit, start_after cursor and field mask.
+    """
+    query = date_range_query(db, date_from, date_to).order_by("date").order_by("__name__").limit(page_size)
+    if cursor:
+        last_date, last_id = decode_cursor(cursor)
+        query = query.start_after({"date": last_date, "__name__": last_id})
+    if fields is not None:
+        # "date" is always read so the next cursor can be built
+        query = query.select(sorted((set(fields) - {"id"}) | {"date"}))
+    return await run_db(lambda: [{**doc.to_dict(), "id": doc.id} for doc in query.stream()], collection="events")
+
 @router.get("/")
-async def get_events():
+async def get_events(
+    request: Request,
+    date_from: str | None = Query(None, alias="from", description="YYYY-MM-DD, inclusive"),
+    date_to: str | None = Query(None, alias="to", description="YYYY-MM-DD, inclusive"),
+    page_size: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Enables pagination"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,title,date,time"),
+):
+    """
+    Without page_size/cursor, returns a plain list (all events, or the from/to range).
+    With them, returns {"events": [...], "next_cursor": str | None}.
+    """
+    selected = parse_fields(fields)
+    load = lambda: load_events(date_from, date_to, page_size, cursor, selected)
+    return await etag_cache.respond(request, EVENTS_SCOPE, load)
+
+async def load_events(date_from: str | None, date_to: str | None, page_size: int | None, cursor: str | None, selected: list | None):
+    if page_size or cursor:
+        page_size = page_size or 100
+        db = get_db()
+        try:
+            if db:
+                # Read one extra document to know whether another page exists
+                page = await fetch_event_page(db, date_from, date_to, page_size + 1, cursor, selected)
+            else:
+                await event_index.ensure_loaded()
+                page = sorted(event_index.range(date_from, date_to), key=lambda e: (e.get("date"), e.get("id")))
+                if cursor:
+                    marker = decode_cursor(cursor)
+                    page = [e for e in page if (e.get("date"), e.get("id")) > marker]
+                page = page[:page_size + 1]
+        except HTTPException:
+            raise
+        except Exception as e:
+            print(f"Error fetching events: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to fetch events: {e}")
+
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        return {
+            "events": [project(e, selected) for e in page],
+            "next_cursor": encode_cursor(page[-1]) if has_more else None,
+        }
+
+    if date_from or date_to:
+        # The calendar's month view: a Firestore range query, so uploads from
+        # other instances show up at once; demo mode uses the in-process index
+        db = get_db()
+        try:
+            if db:
+                events = await fetch_event_range(db, date_from, date_to, selected)
+            else:
+                await event_index.ensure_loaded()
+                events = event_index.range(date_from, date_to)
+        except Exception as e:
+            print(f"Error fetching events: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to fetch events: {e}")
+        return [project(e, selected) for e in events]
+
     db = get_db()
     if not db:
-         from backend.services.store import demo_events
-         return demo_events
+         from backend.services.store import demo_store
+         return [project(e, selected) for e in demo_store.list_events()]
          
     try:
         # Simple fetch all for now
-        docs = db.collection("events").stream()
-        return [doc.to_dict() for doc in docs]
+        query = db.collection("events")
+        if selected is not None:
+            query = query.select([f for f in selected if f != "id"])
+        return await run_db(lambda: [project({**doc.to_dict(), "id": doc.id}, selected) for doc in query.stream()], collection="events")
     except Exception as e:
         print(f"Error fetching events: {e}")
         return []
@@ -79,19 +337,13 @@ async def delete_event(event_id: str):
     db = get_db()
     if not db:
         # Demo Mode
-        from backend.services.store import demo_events
-        initial_count = len(demo_events)
-        # Filter out the event to delete
-        # Note: demo_events is a list, so we need to mutate it or replace contents
-        # Since we imported the list reference, we should modify it in place or careful
-        # Actually standard python import: names are bound. Modifying list content works.
-        # But `demo_events = [...]` would just rebind local name.
-        # So we must do `demo_events[:] = ...` or remove item.
-        # Let's find index.
-        for i, event in enumerate(demo_events):
-             if event.get('id') == event_id:
-                 del demo_events[i]
-                 return {"message": "Event deleted (Demo)"}
+        from backend.services.store import demo_store
+        event = demo_store.delete_event(event_id)
+        if event:
+            event_index.remove(event_id)
+            etag_cache.bump(EVENTS_SCOPE)
+            invalidate_briefings_for([event])
+            return {"message": "Event deleted (Demo)"}
         
         # If not found (or maybe ID mismatch), just return success
         return {"message": "Event not found in Demo store"}
@@ -107,7 +359,11 @@ async def delete_event(event_id: str):
         # Or front-end uses the doc ID.
         # Let's assume frontend sends doc ID.
         
-        db.collection("events").document(event_id).delete()
+        await run_db(db.collection("events").document(event_id).delete, collection="events", op="delete")
+        event_index.remove(event_id)
+        etag_cache.bump(EVENTS_SCOPE)
+        # The deleted event's date is unknown here
+        briefing_cache.invalidate_all()
         return {"message": "Event deleted"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete event: {e}")
@@ -1,16 +1,26 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from backend.services.gemini import gemini_service
-from backend.services.firebase import get_db
+from typing import List, Literal
+from backend.services.task_analyzer import task_analyzer, split_lines, MAX_BATCH_LINES
+from backend.services.firebase import get_db, run_db, commit_in_batches
+from backend.services.briefing_cache import briefing_cache
+from backend.services.etag import etag_cache
 from datetime import datetime
-import json
 import uuid
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Fields a client may change on an existing task
+ALLOWED_UPDATES = ["is_completed", "is_deleted", "priority", "content", "due_date"]
+MAX_BULK_OPERATIONS = 1000
+
 class TaskInput(BaseModel):
     text: str
 
+class BatchTaskInput(BaseModel):
+    texts: List[str] | None = None  # one item per entry
+    text: str | None = None         # pasted notes, one item per line
+
 class Task(BaseModel):
     id: str
     uid: str
@@ -21,34 +31,58 @@ class Task(BaseModel):
     is_deleted: bool = False
     created_at: str
 
+class BulkOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: str | None = None           # update / delete
+    task: str | None = None         # create
+    due_date: str | None = None     # create
+    priority: str | None = None     # create
+    updates: dict = {}              # update
+
+class BulkRequest(BaseModel):
+    operations: List[BulkOperation]
+
+def new_task_doc(uid: str, task_data: dict) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "uid": uid,
+        "content": task_data.get("task") or "Untitled Task",
+        "due_date": task_data.get("due_date"),
+        "priority": task_data.get("priority") or "Medium",
+        "is_completed": False,
+        "is_deleted": False,
+        "created_at": datetime.now().isoformat()
+    }
+
 @router.post("/analyze")
 async def analyze_task(input: TaskInput):
     """
     Analyzes raw text using Gemini to extract task details.
     """
-    prompt = f"""
-    You are a helpful assistant. Extract the following details from the user's input:
-    - task: The main task description.
-    - due_date: The due date in ISO 8601 format (YYYY-MM-DD) if mentioned. If "next Tuesday", calculate it based on today ({datetime.now().strftime('%Y-%m-%d')}). If not mentioned, return null.
-    - priority: High, Medium, or Low. Infer from context (e.g., "urgent", "important" = High). Default to Medium.
-    
-    Return ONLY a valid JSON object.
-    
-    User Input: "{input.text}"
-    """
-    
-    response_text = await gemini_service.generate_content(prompt)
-    
     try:
-        # cleanup code blocks if present
-        clean_text = response_text.replace("```json", "").replace("```", "").strip()
-        data = json.loads(clean_text)
-        return data
+        return await task_analyzer.analyze(input.text)
     except Exception as e:
         import traceback
         traceback.print_exc()
-        print(f"Failed to parse Gemini response: {response_text}")
-        raise HTTPException(status_code=500, detail=f"Failed to analyze task: {e}. Raw: {response_text[:100]}")
+        raise HTTPException(status_code=500, detail=f"Failed to analyze task: {e}")
+
+@router.post("/analyze/batch")
+async def analyze_tasks(input: BatchTaskInput):
+    """
+    Analyzes many to-do lines (a list, or pasted notes split by line) with one
+    Gemini call per chunk of lines instead of one per line.
+    Returns one result per line, in order; failed lines carry "error".
+    """
+    lines = [line.strip() for line in input.texts if line.strip()] if input.texts is not None else split_lines(input.text or "")
+    if not lines:
+        raise HTTPException(status_code=400, detail="No task lines given.")
+    if len(lines) > MAX_BATCH_LINES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_LINES} lines per request.")
+
+    results, report = await task_analyzer.analyze_batch(lines)
+    if report["failed"] == len(lines):
+        raise HTTPException(status_code=500, detail=f"Failed to analyze tasks: {results[0]['error']}")
+    return {"results": results, "report": report}
 
 @router.post("/")
 async def create_task(task_data: dict):
@@ -56,77 +90,158 @@ async def create_task(task_data: dict):
     Saves a task to Firestore.
     """
     db = get_db()
+    uid = task_data.get("uid", "default_user") # In real app, get from auth token
+    new_task = new_task_doc(uid, task_data)
+
     if not db:
         # Demo mode: Save to in-memory store
-        from backend.services.store import demo_tasks
-        
-        uid = task_data.get("uid", "default_user")
-        task_id = str(uuid.uuid4())
-        
-        new_task = {
-            "id": task_id,
-            "uid": uid,
-            "content": task_data.get("task", "Untitled Task"),
-            "due_date": task_data.get("due_date"),
-            "priority": task_data.get("priority", "Medium"),
-            "is_completed": False,
-            "is_deleted": False,
-            "created_at": datetime.now().isoformat(),
-            "note": "Demo Mode: Saved to Memory"
-        }
-        demo_tasks.append(new_task)
+        from backend.services.store import demo_store
+        new_task["note"] = "Demo Mode: Saved to Memory"
+        demo_store.add_task(new_task)
+        briefing_cache.invalidate_user(uid)
+        etag_cache.bump(("tasks", uid))
         return new_task
-
-    # Simple validation or use Pydantic model
-    uid = task_data.get("uid", "default_user") # In real app, get from auth token
-    task_id = str(uuid.uuid4())
-    
-    new_task = {
-        "id": task_id,
-        "uid": uid,
-        "content": task_data.get("task", "Untitled Task"),
-        "due_date": task_data.get("due_date"),
-        "priority": task_data.get("priority", "Medium"),
-        "is_completed": False,
-        "is_deleted": False,
-        "created_at": datetime.now().isoformat()
-    }
     
     try:
-        db.collection("tasks").document(task_id).set(new_task)
+        await run_db(db.collection("tasks").document(new_task["id"]).set, new_task, collection="tasks", op="write")
+        briefing_cache.invalidate_user(uid)
+        etag_cache.bump(("tasks", uid))
         return new_task
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save task: {e}")
 
-@router.get("/")
-async def get_tasks(uid: str = "default_user"):
+async def load_tasks(uid: str) -> list:
     db = get_db()
     if not db:
         # Demo mode: Return in-memory tasks
-        from backend.services.store import demo_tasks
-        return demo_tasks
+        from backend.services.store import demo_store
+        return demo_store.list_tasks(uid)
         
     try:
         # Filter by uid and non-deleted
-        docs = db.collection("tasks").where("uid", "==", uid).where("is_deleted", "==", False).stream()
-        tasks = [doc.to_dict() for doc in docs]
+        query = db.collection("tasks").where("uid", "==", uid).where("is_deleted", "==", False)
+        tasks = await run_db(lambda: [doc.to_dict() for doc in query.stream()], collection="tasks")
         return tasks
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch tasks: {e}")
 
+@router.get("/")
+async def get_tasks(request: Request, uid: str = "default_user"):
+    return await etag_cache.respond(request, ("tasks", uid), lambda: load_tasks(uid))
+
 @router.patch("/{task_id}")
-async def update_task(task_id: str, updates: dict):
+async def update_task(task_id: str, updates: dict, uid: str = "default_user"):
     db = get_db()
+    # Ensure we only update allowed fields
+    allowed_updates = {k: v for k, v in updates.items() if k in ALLOWED_UPDATES}
     if not db:
-        return {"status": "success", "note": "Demo Mode: Not saved"}
+        from backend.services.store import demo_store
+        if not allowed_updates:
+            return {"status": "no_updates"}
+        if not demo_store.update_task(task_id, uid, allowed_updates):
+            raise HTTPException(status_code=404, detail="Task not found")
+        briefing_cache.invalidate_user(uid)
+        etag_cache.bump(("tasks", uid))
+        return {"status": "success", "updates": allowed_updates, "note": "Demo Mode: Saved to Memory"}
         
+    if not allowed_updates:
+        return {"status": "no_updates"}
     try:
         ref = db.collection("tasks").document(task_id)
-        # Ensure we only update allowed fields
-        allowed_updates = {k: v for k, v in updates.items() if k in ["is_completed", "is_deleted", "priority", "content", "due_date"]}
-        if allowed_updates:
-            ref.update(allowed_updates)
-            return {"status": "success", "updates": allowed_updates}
-        return {"status": "no_updates"}
+        # Only the owner may update, like /bulk
+        snap = await run_db(ref.get, collection="tasks")
+        owner = snap.get("uid") if snap.exists else None
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update task: {e}")
+    if owner != uid:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    try:
+        await run_db(ref.update, allowed_updates, collection="tasks", op="write")
+        briefing_cache.invalidate_user(owner)
+        etag_cache.bump(("tasks", owner))
+        return {"status": "success", "updates": allowed_updates}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update task: {e}")
+
+@router.post("/bulk")
+async def bulk_tasks(request: BulkRequest, uid: str = "default_user"):
+    """
+    Applies many create / update / delete operations in one request.
+    Deletes are soft deletes (is_deleted=True), like PATCH. Updates go through the
+    same ALLOWED_UPDATES filter. Returns one result per operation, in order.
+    """
+    ops = request.operations
+    if len(ops) > MAX_BULK_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_OPERATIONS} operations per request.")
+
+    results = [{"index": i, "op": op.op, "id": op.id} for i, op in enumerate(ops)]
+    # (operation index, task id, write kind, payload) for every operation that passes validation
+    planned = []
+    for i, op in enumerate(ops):
+        if op.op == "create":
+            task = new_task_doc(uid, op.model_dump())
+            results[i]["id"] = task["id"]
+            results[i]["task"] = task
+            planned.append((i, task["id"], "set", task))
+        elif not op.id:
+            results[i].update(status="error", detail="id is required")
+        elif op.op == "update":
+            allowed_updates = {k: v for k, v in op.updates.items() if k in ALLOWED_UPDATES}
+            if allowed_updates:
+                results[i]["updates"] = allowed_updates
+                planned.append((i, op.id, "update", allowed_updates))
+            else:
+                results[i]["status"] = "no_updates"
+        else:
+            planned.append((i, op.id, "update", {"is_deleted": True}))
+
+    db = get_db()
+    if not db:
+        # Demo mode: apply to the in-memory store
+        from backend.services.store import demo_store
+        for i, task_id, kind, payload in planned:
+            if kind == "set":
+                demo_store.add_task(payload)
+            elif not demo_store.update_task(task_id, uid, payload):
+                results[i].update(status="error", detail="not_found")
+                continue
+            results[i]["status"] = "success"
+    else:
+        collection = db.collection("tasks")
+        # One round-trip to check that updated/deleted tasks exist and belong to this user
+        existing_refs = [collection.document(task_id) for _, task_id, kind, _ in planned if kind == "update"]
+        owners = {}
+        if existing_refs:
+            try:
+                snapshots = await run_db(lambda: list(db.get_all(existing_refs)), collection="tasks")
+                owners = {snap.id: snap.get("uid") for snap in snapshots if snap.exists}
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Failed to read tasks: {e}")
+
+        writes = []
+        write_ops = []
+        for i, task_id, kind, payload in planned:
+            if kind == "update" and owners.get(task_id) != uid:
+                results[i].update(status="error", detail="not_found")
+                continue
+            writes.append((kind, collection.document(task_id), payload))
+            write_ops.append(i)
+
+        batches = await commit_in_batches(db, writes, collection="tasks")
+        for batch in batches:
+            for i in write_ops[batch["start"]:batch["start"] + batch["writes"]]:
+                if batch["ok"]:
+                    results[i]["status"] = "success"
+                else:
+                    results[i].update(status="error", detail=batch.get("error", "commit failed"))
+
+    succeeded = sum(1 for r in results if r.get("status") == "success")
+    if succeeded:
+        briefing_cache.invalidate_user(uid)
+        etag_cache.bump(("tasks", uid))
+    return {
+        "succeeded": succeeded,
+        "failed": sum(1 for r in results if r.get("status") == "error"),
+        "results": results,
+    }
@@ -0,0 +1,79 @@
+import os
+import sys
+from collections import OrderedDict
+
+
+class BriefingCache:
+    """
+    Bounded per-user cache of generated briefings, keyed by (uid, date).
+
+    Writers call `invalidate_user` / `invalidate_all` when the underlying data
+    changes. A per-user generation counter keeps a briefing that was being
+    generated while its data changed from being stored afterwards.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._global_generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def generation(self, uid: str) -> tuple[int, int]:
+        return self._global_generation, self._generations.get(uid, 0)
+
+    def get(self, uid: str, date: str) -> str | None:
+        content = self._entries.get((uid, date))
+        if content:
+            self._entries.move_to_end((uid, date))
+            self.hits += 1
+            return content
+        self.misses += 1
+        return None
+
+    def contains(self, uid: str, date: str) -> bool:
+        """Presence check that does not count as a hit or miss."""
+        return (uid, date) in self._entries
+
+    def set(self, uid: str, date: str, content: str, generation: tuple[int, int] | None = None):
+        if generation is not None and generation != self.generation(uid):
+            # Data changed while this briefing was being generated
+            return
+        self._entries[(uid, date)] = content
+        self._entries.move_to_end((uid, date))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, uid: str):
+        self._generations[uid] = self._generations.get(uid, 0) + 1
+        for key in [k for k in self._entries if k[0] == uid]:
+            del self._entries[key]
+            self.invalidations += 1
+
+    def invalidate_all(self):
+        self._global_generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def memory_bytes(self) -> int:
+        return sum(
+            sys.getsizeof(uid) + sys.getsizeof(date) + sys.getsizeof(content)
+            for (uid, date), content in self._entries.items()
+        )
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+
+briefing_cache = BriefingCache(max_entries=int(os.getenv("BRIEFING_CACHE_MAX_ENTRIES", 512)))
@@ -0,0 +1,116 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+
+class BriefingScheduler:
+    """
+    Pre-generates the day's briefings in the background at a fixed local time
+    (BRIEFING_PREGEN_TIME, "HH:MM"), with at most BRIEFING_PREGEN_CONCURRENCY
+    Gemini calls in flight.
+
+    `generate(uid, date_str)` produces and caches one briefing, `is_cached(uid, date_str)`
+    tells whether that is still needed, and `list_uids()` returns the users to cover.
+    """
+
+    def __init__(self, generate, is_cached, list_uids):
+        self.generate = generate
+        self.is_cached = is_cached
+        self.list_uids = list_uids
+        self.enabled = os.getenv("BRIEFING_PREGEN_ENABLED", "1") != "0"
+        self.run_at = os.getenv("BRIEFING_PREGEN_TIME", "00:05")
+        self.concurrency = max(1, int(os.getenv("BRIEFING_PREGEN_CONCURRENCY", 3)))
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self.status = {
+            "enabled": self.enabled,
+            "run_at": self.run_at,
+            "concurrency": self.concurrency,
+            "running": False,
+            "next_run": None,
+            "last_run": None,
+        }
+
+    def next_run_time(self, now: datetime | None = None) -> datetime:
+        now = now or datetime.now()
+        hour, minute = (int(x) for x in self.run_at.split(":"))
+        target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target <= now:
+            target += timedelta(days=1)
+        return target
+
+    async def run_once(self) -> dict:
+        """Generates today's missing briefings for every active uid."""
+        if self._lock.locked():
+            return self.status["last_run"] or {}
+
+        async with self._lock:
+            self.status["running"] = True
+            today_str = datetime.now().strftime("%Y-%m-%d")
+            started = time.perf_counter()
+            run = {
+                "date": today_str,
+                "started_at": datetime.now().isoformat(),
+                "finished_at": None,
+                "duration_s": None,
+                "users": 0,
+                "generated": 0,
+                "skipped": 0,
+                "failed": 0,
+                "errors": [],
+            }
+            self.status["last_run"] = run
+
+            try:
+                uids = await self.list_uids()
+                run["users"] = len(uids)
+                sem = asyncio.Semaphore(self.concurrency)
+
+                async def one(uid: str):
+                    if self.is_cached(uid, today_str):
+                        run["skipped"] += 1
+                        return
+                    async with sem:
+                        try:
+                            text = await self.generate(uid, today_str)
+                            if text.startswith("Error:"):
+                                raise Exception(text)
+                            run["generated"] += 1
+                        except Exception as e:
+                            run["failed"] += 1
+                            if len(run["errors"]) < 10:
+                                run["errors"].append(f"{uid}: {str(e)[:200]}")
+
+                await asyncio.gather(*(one(uid) for uid in uids))
+            except Exception as e:
+                print(f"Briefing pre-generation failed: {e}")
+                run["errors"].append(str(e)[:200])
+            finally:
+                run["finished_at"] = datetime.now().isoformat()
+                run["duration_s"] = round(time.perf_counter() - started, 3)
+                self.status["running"] = False
+
+            print(f"Briefing pre-generation: {run['generated']} generated, {run['skipped']} cached, {run['failed']} failed")
+            return run
+
+    async def _loop(self):
+        while True:
+            target = self.next_run_time()
+            self.status["next_run"] = target.isoformat()
+            await asyncio.sleep(max(0.0, (target - datetime.now()).total_seconds()))
+            await self.run_once()
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self.status["next_run"] = None
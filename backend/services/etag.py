@@ -0,0 +1,106 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+from fastapi import Request, Response
+
+from backend.services.serialization import dumps
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/"x" matches "x"."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+class ETagCache:
+    """
+    ETags (hash of the response body) for polled GET endpoints.
+
+    The tags are weak (W/"..."): the compression middleware sends the same
+    body as br, gzip or identity, and a strong validator would have to differ
+    between those representations. Vary: Accept-Encoding is always sent, also
+    on identity responses the middleware leaves alone.
+
+    Writers call `bump(scope)` for the data they change, e.g. ("tasks", uid).
+    A remembered ETag is trusted while its scope hasn't been bumped since and it
+    is younger than `trust_ttl`; a matching If-None-Match is then answered with
+    304 before Firestore is read. After that (writes from other instances are
+    not seen here) the data is read again and the body hash decides.
+    """
+
+    def __init__(self, trust_ttl: float = 60.0, max_entries: int = 1024):
+        self.trust_ttl = trust_ttl
+        self.max_entries = max_entries
+        self._versions: dict[tuple, int] = {}
+        # (scope, query) -> (etag, scope version, stored at)
+        self._entries: OrderedDict[tuple, tuple[str, int, float]] = OrderedDict()
+        self.not_modified_cached = 0
+        self.not_modified_read = 0
+        self.full = 0
+
+    def bump(self, scope: tuple):
+        self._versions[scope] = self._versions.get(scope, 0) + 1
+
+    def _trusted(self, key: tuple, scope: tuple, if_none_match: str | None) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or not _matches(if_none_match, entry[0]):
+            return False
+        etag, version, stored_at = entry
+        return version == self._versions.get(scope, 0) and time.monotonic() - stored_at < self.trust_ttl
+
+    def _remember(self, key: tuple, etag: str, version: int):
+        self._entries[key] = (etag, version, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def respond(self, request: Request, scope: tuple, load, headers: dict | None = None) -> Response:
+        """
+        Conditional GET: returns 304 or the JSON of `await load()` with an ETag.
+        `headers` (filled in by load, if given) are sent with the body and hashed with it.
+        """
+        if_none_match = request.headers.get("if-none-match")
+        key = (scope, request.url.query)
+        if self._trusted(key, scope, if_none_match):
+            self.not_modified_cached += 1
+            return Response(status_code=304, headers={"ETag": self._entries[key][0], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+
+        # Read the version first: a write during load makes this entry untrusted
+        version = self._versions.get(scope, 0)
+        headers = headers if headers is not None else {}
+        data = await load()
+        body = dumps(data)
+        digest = hashlib.sha1(body)
+        for name in sorted(headers):
+            digest.update(f"\n{name}:{headers[name]}".encode("utf-8"))
+        etag = f'W/"{digest.hexdigest()}"'
+        self._remember(key, etag, version)
+
+        # no-cache: browsers keep the body but revalidate with If-None-Match every time
+        out_headers = {**headers, "ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if _matches(if_none_match, etag):
+            self.not_modified_read += 1
+            return Response(status_code=304, headers=out_headers)
+        self.full += 1
+        return Response(content=body, media_type="application/json", headers=out_headers)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "not_modified_cached": self.not_modified_cached,
+            "not_modified_read": self.not_modified_read,
+            "full": self.full,
+        }
+
+
+etag_cache = ETagCache(
+    trust_ttl=float(os.getenv("ETAG_TRUST_TTL", 60)),
+    max_entries=int(os.getenv("ETAG_CACHE_MAX_ENTRIES", 1024)),
+)
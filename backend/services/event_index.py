@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, timedelta
+
+from backend.services.firebase import get_db, run_db
+
+
+def _valid_date(value) -> str | None:
+    try:
+        return date.fromisoformat(str(value)[:10]).isoformat()
+    except (TypeError, ValueError):
+        return None
+
+
+class EventIndex:
+    """
+    In-process index of events by date.
+
+    Dates are kept as a sorted list of unique YYYY-MM-DD strings (which sort
+    chronologically), so a range is two bisects plus the matching events:
+    O(log n + k). Loaded from Firestore (or the demo store) on first use,
+    updated by this process's uploads and deletes, and reloaded after
+    EVENT_INDEX_TTL seconds to pick up writes from other instances.
+
+    With Firestore only the window the briefing reads is loaded, `past_days`
+    before today to `future_days` after it, so a reload doesn't read the
+    whole event history. Range reads for the calendar query Firestore directly.
+    """
+
+    def __init__(self, ttl: float = 300.0, past_days: int = 1, future_days: int = 14):
+        self.ttl = ttl
+        self.past_days = past_days
+        self.future_days = future_days
+        self._dates: list[str] = []
+        self._by_date: dict[str, dict[str, dict]] = {}
+        self._date_of: dict[str, str] = {}
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._date_of)
+
+    def clear(self):
+        self._dates = []
+        self._by_date = {}
+        self._date_of = {}
+
+    def _add(self, event: dict):
+        event_id = event.get("id")
+        day = _valid_date(event.get("date"))
+        if not event_id or not day:
+            return
+        self._remove(event_id)
+        bucket = self._by_date.get(day)
+        if bucket is None:
+            bucket = self._by_date[day] = {}
+            insort(self._dates, day)
+        bucket[event_id] = event
+        self._date_of[event_id] = day
+
+    def _remove(self, event_id: str):
+        day = self._date_of.pop(event_id, None)
+        if day is None:
+            return
+        bucket = self._by_date[day]
+        bucket.pop(event_id, None)
+        if not bucket:
+            del self._by_date[day]
+            del self._dates[bisect_left(self._dates, day)]
+
+    def load(self, events: list):
+        self.clear()
+        for event in events:
+            self._add(event)
+        self._loaded_at = time.monotonic()
+
+    def upsert(self, events: list):
+        for event in events:
+            self._add(event)
+
+    def remove(self, event_id: str):
+        self._remove(event_id)
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    async def ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl:
+                return
+            db = get_db()
+            if db:
+                today = date.today()
+                query = (db.collection("events")
+                         .where("date", ">=", (today - timedelta(days=self.past_days)).isoformat())
+                         .where("date", "<=", (today + timedelta(days=self.future_days)).isoformat()))
+                events = await run_db(lambda: [{"id": doc.id, **doc.to_dict()} for doc in query.stream()], collection="events")
+            else:
+                from backend.services.store import demo_store
+                events = demo_store.list_events()
+            self.load(events)
+
+    def range(self, start: str | None = None, end: str | None = None) -> list:
+        """Events with start <= date <= end (either bound optional), ordered by date then time."""
+        lo = bisect_left(self._dates, start) if start else 0
+        hi = bisect_right(self._dates, end) if end else len(self._dates)
+        result = []
+        for day in self._dates[lo:hi]:
+            result.extend(sorted(self._by_date[day].values(), key=lambda e: str(e.get("time") or "")))
+        return result
+
+    def buckets(self, today: date) -> dict:
+        """Briefing buckets: today, tomorrow, rest of this week (to Sunday) and next week."""
+        tomorrow = today + timedelta(days=1)
+        # weekday: Mon=0, Sun=6
+        this_week_end = today + timedelta(days=6 - today.weekday())
+        # On Sundays, tomorrow (Monday) belongs to the tomorrow bucket only
+        next_week_start = max(this_week_end + timedelta(days=1), tomorrow + timedelta(days=1))
+        next_week_end = this_week_end + timedelta(days=7)
+        return {
+            "today": self.range(today.isoformat(), today.isoformat()),
+            "tomorrow": self.range(tomorrow.isoformat(), tomorrow.isoformat()),
+            "this_week": self.range((tomorrow + timedelta(days=1)).isoformat(), this_week_end.isoformat()),
+            "next_week": self.range(next_week_start.isoformat(), next_week_end.isoformat()),
+        }
+
+
+# The briefing reads up to the end of next week, at most 13 days ahead
+event_index = EventIndex(
+    ttl=float(os.getenv("EVENT_INDEX_TTL", 300)),
+    past_days=int(os.getenv("EVENT_INDEX_PAST_DAYS", 1)),
+    future_days=int(os.getenv("EVENT_INDEX_FUTURE_DAYS", 14)),
+)
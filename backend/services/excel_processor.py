@@ -1,38 +1,169 @@
 import io
 import csv
-from openpyxl import load_workbook
+import os
+import re
+import time
+import asyncio
+import hashlib
 from fastapi import UploadFile
 from backend.services.gemini import gemini_service
+from backend.services.schedule_parser import parse_sheet
+from backend.services.prompt_builder import MAX_LINE_TOKENS, chunk_by_budget, clip, compact, estimate_tokens, record
 import json
 
+# Same workbook content -> same extraction; re-uploads are served from the LLM cache
+SCHEDULE_CACHE_TTL = 7 * 24 * 3600
+
+# Rows per Gemini call, and how many calls run at once
+CHUNK_ROWS = int(os.getenv("SCHEDULE_CHUNK_ROWS", 80))
+CHUNK_WORKERS = int(os.getenv("SCHEDULE_CHUNK_WORKERS", 4))
+# Estimated tokens of CSV data per chunk; a chunk closes early when its rows would exceed it
+CHUNK_TOKENS = int(os.getenv("SCHEDULE_PROMPT_TOKENS", 6000))
+# Parse recognizable sheets locally and only send the rest to Gemini
+LOCAL_PARSER = os.getenv("SCHEDULE_LOCAL_PARSER", "1") != "0"
+
+def event_key(event: dict) -> tuple:
+    """Natural key of an event: (date, time, title), whitespace/case-normalized."""
+    def norm(value):
+        return " ".join(str(value or "").split()).lower()
+    return (norm(event.get("date")), norm(event.get("time")), norm(event.get("title")))
+
+def event_id(event: dict) -> str:
+    """Stable document id derived from the natural key, so re-imports upsert instead of append."""
+    return hashlib.sha1("\x1f".join(event_key(event)).encode("utf-8")).hexdigest()[:20]
+
+def file_fingerprint(contents: bytes) -> str:
+    return hashlib.sha256(contents).hexdigest()
+
+def row_fingerprint(sheet: str, header: list, row: list) -> str:
+    payload = json.dumps([sheet, header, row], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+def to_csv(rows: list) -> str:
+    """CSV for the prompt; an oversized cell (a memo pasted into one cell) is clipped."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    for row in rows:
+        writer.writerow([clip(cell, MAX_LINE_TOKENS) if isinstance(cell, str) else cell for cell in row])
+    return output.getvalue()
+
+def import_groups(record: dict | None) -> list:
+    """Groups of an import record; older records only kept row fingerprints, with unknown events."""
+    if not record:
+        return []
+    if "groups" in record:
+        return record["groups"]
+    return [{"rows": record.get("row_hashes", []), "events": []}] if record.get("row_hashes") else []
+
+def split_groups(groups: list, current_rows: set) -> tuple[list, list]:
+    """
+    Splits a previous import's groups ({"rows": row fingerprints of one Gemini
+    chunk, "events": ids extracted from them}) into (kept, stale). A group is
+    stale once any of its rows changed or was removed; its events are replaced
+    by re-extracting the rows that are left.
+    """
+    kept, stale = [], []
+    for group in groups:
+        (kept if all(h in current_rows for h in group["rows"]) else stale).append(group)
+    return kept, stale
+
+def dedupe_events(events: list) -> list:
+    seen = set()
+    unique = []
+    for event in events:
+        key = event_key(event)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(event)
+    return unique
+
 class ExcelProcessor:
-    async def process_schedule(self, file: UploadFile) -> list:
+    def read_sheets(self, contents: bytes) -> list:
+        """
+        Loads every sheet of the workbook.
+        Returns [{"sheet": name, "header": first non-empty row, "rows": remaining non-empty rows}].
+        """
+        # Imported on first upload; openpyxl adds ~0.1s to a cold start otherwise
+        from openpyxl import load_workbook
+
+        wb = load_workbook(filename=io.BytesIO(contents), data_only=True, read_only=True)
+        sheets = []
         try:
-            # 1. Read Excel file
-            print("DEBUG: Reading Excel file...")
-            contents = await file.read()
-            wb = load_workbook(filename=io.BytesIO(contents), data_only=True)
-            ws = wb.active
-            
-            # Convert to CSV string for token efficiency
-            output = io.StringIO()
-            writer = csv.writer(output)
-            for row in ws.iter_rows(values_only=True):
-                # Filter out completely empty rows
-                if any(cell is not None for cell in row):
-                    writer.writerow(row)
-            
-            csv_data = output.getvalue()
-            # print(f"DEBUG: Excel read successfully. CSV length: {len(csv_data)}")
-            
-            # 2. Prompt Gemini
-            print("DEBUG: Prompting Gemini...")
-            prompt = f"""
+            for ws in wb.worksheets:
+                rows = [row for row in ws.iter_rows(values_only=True) if any(cell is not None for cell in row)]
+                if not rows:
+                    continue
+                sheets.append({"sheet": ws.title, "header": list(rows[0]), "rows": [list(r) for r in rows[1:]]})
+        finally:
+            wb.close()
+        return sheets
+
+    def parse_locally(self, sheets: list) -> tuple[list, list]:
+        """Returns (locally parsed events, sheets/rows left for the LLM)."""
+        if not LOCAL_PARSER:
+            return [], sheets
+        events = []
+        leftover = []
+        for sheet in sheets:
+            sheet_events, rest = parse_sheet(sheet)
+            events.extend(sheet_events)
+            if rest:
+                leftover.append(rest)
+        return events, leftover
+
+    def skip_known_rows(self, sheets: list, known_rows: set) -> tuple[list, int]:
+        """
+        Drops rows whose fingerprint is in `known_rows` (already extracted by an earlier import).
+        Returns (remaining sheets, number of skipped rows).
+        """
+        remaining = []
+        skipped = 0
+        for sheet in sheets:
+            rows = []
+            for row in sheet["rows"]:
+                if row_fingerprint(sheet["sheet"], sheet["header"], row) in known_rows:
+                    skipped += 1
+                else:
+                    rows.append(row)
+            if rows or not sheet["rows"]:
+                remaining.append({**sheet, "rows": rows})
+        return remaining, skipped
+
+    def make_chunks(self, sheets: list, chunk_rows: int = CHUNK_ROWS, chunk_tokens: int = CHUNK_TOKENS) -> list:
+        """
+        Splits sheets into row chunks of at most `chunk_rows` rows and about
+        `chunk_tokens` tokens of CSV; each chunk repeats its sheet's header row
+        for context. Rows are never dropped: a full chunk just starts the next one.
+        """
+        chunks = []
+        for sheet in sheets:
+            header_cost = estimate_tokens(to_csv([sheet["header"]]))
+            rows = [r for r in sheet["rows"] if r]
+            cost = lambda row: estimate_tokens(to_csv([row]))
+            for selected in chunk_by_budget(rows, cost, chunk_tokens - header_cost, chunk_rows) or [[]]:
+                chunks.append({
+                    "index": len(chunks),
+                    "sheet": sheet["sheet"],
+                    "header": sheet["header"],
+                    "rows": selected,
+                    "row_hashes": [row_fingerprint(sheet["sheet"], sheet["header"], r) for r in selected],
+                })
+        return chunks
+
+    def build_prompt(self, chunk: dict) -> str:
+        # Convert to CSV string for token efficiency
+        csv_data = to_csv([chunk["header"]] + chunk["rows"])
+
+        return record("schedule", compact(f"""
             Analyze the following school schedule data and extract events.
-            
+
+            [Sheet]
+            {chunk["sheet"]}
+
             [Data]
             {csv_data}
-            
+
             [System Prompt]
             Extract school events from this data. Return a valid JSON list of objects with these keys:
             - title: Name of the event
@@ -49,36 +180,121 @@ class ExcelProcessor:
             - Normalize dates to YYYY-MM-DD.
             - If a field is missing, use empty string "".
             - Return ONLY raw JSON.
-            """
-            
-            response_text = await gemini_service.generate_content(prompt)
-            print(f"DEBUG: Gemini raw response: {response_text[:100]}...") # Print first 100 chars
-            
-            # Check for service-level errors
-            if response_text.startswith("Error:"):
-                 raise Exception(f"AI Service Error: {response_text}")
-
-            # 3. Parse JSON with Regex
-            import re
-            clean_text = response_text.strip()
-            match = re.search(r'\[.*\]', clean_text, re.DOTALL)
-            if match:
-                clean_text = match.group(0)
-            else:
-                clean_text = clean_text.replace("```json", "").replace("```", "").strip()
-
-            try:
-                events = json.loads(clean_text)
-                print(f"DEBUG: Parsed {len(events)} events")
-                return events
-            except json.JSONDecodeError as e:
-                print(f"JSON Parse Failed. Raw Text: {response_text}")
-                # Return raw text in error for debugging
-                raise Exception(f"Failed to parse AI response. Raw: {response_text[:500]}... Error: {e}")
+            """))
+
+    def parse_response(self, response_text: str) -> list:
+        # Check for service-level errors
+        if response_text.startswith("Error:"):
+             raise Exception(f"AI Service Error: {response_text}")
+
+        # Parse JSON with Regex
+        clean_text = response_text.strip()
+        match = re.search(r'\[.*\]', clean_text, re.DOTALL)
+        if match:
+            clean_text = match.group(0)
+        else:
+            clean_text = clean_text.replace("```json", "").replace("```", "").strip()
+
+        try:
+            events = json.loads(clean_text)
+        except json.JSONDecodeError as e:
+            print(f"JSON Parse Failed. Raw Text: {response_text}")
+            # Return raw text in error for debugging
+            raise Exception(f"Failed to parse AI response. Raw: {response_text[:500]}... Error: {e}")
+        if not isinstance(events, list):
+            raise Exception(f"Unexpected AI response shape: {type(events).__name__}")
+        return [e for e in events if isinstance(e, dict)]
+
+    async def extract_chunk(self, chunk: dict) -> list:
+        response_text = await gemini_service.generate_content(self.build_prompt(chunk), cache_ttl=SCHEDULE_CACHE_TTL)
+        return self.parse_response(response_text)
+
+    async def extract_chunks(self, chunks: list, workers: int = CHUNK_WORKERS) -> tuple[list, list]:
+        """
+        Extracts events from all chunks with at most `workers` Gemini calls in flight.
+        Returns (events per chunk, None for failed chunks; per-chunk reports).
+        """
+        sem = asyncio.Semaphore(max(1, workers))
+        results = [None] * len(chunks)
+        reports = [None] * len(chunks)
+
+        async def run(chunk: dict):
+            async with sem:
+                started = time.perf_counter()
+                report = {"index": chunk["index"], "sheet": chunk["sheet"], "rows": len(chunk["rows"])}
+                try:
+                    results[chunk["index"]] = await self.extract_chunk(chunk)
+                    report["events"] = len(results[chunk["index"]])
+                except Exception as e:
+                    report["error"] = str(e)[:300]
+                report["seconds"] = round(time.perf_counter() - started, 3)
+                reports[chunk["index"]] = report
+
+        await asyncio.gather(*(run(c) for c in chunks))
+        return results, reports
+
+    async def process_contents(self, contents: bytes, previous: dict | None = None) -> tuple[list, dict, dict]:
+        """
+        Extracts events from every sheet of a workbook.
+        `previous` is the last import record of the same file: rows of its
+        groups that are unchanged are not sent to Gemini again.
+        Returns (de-duplicated events, report with per-chunk timings, sources)
+        where sources = {"groups": kept and new groups, "stale": groups whose
+        rows changed, "local": ids of locally parsed events}.
+        """
+        try:
+            started = time.perf_counter()
+            # 1. Read Excel file
+            sheets = await asyncio.to_thread(self.read_sheets, contents)
+
+            # 2. Local header-based parsing
+            local_events, leftover = self.parse_locally(sheets)
+            current_rows = {row_fingerprint(s["sheet"], s["header"], r) for s in leftover for r in s["rows"]}
+            kept, stale = split_groups(import_groups(previous), current_rows)
+            known_rows = {h for g in kept for h in g["rows"]}
+            leftover, skipped_rows = self.skip_known_rows(leftover, known_rows)
+            chunks = self.make_chunks(leftover)
+            print(f"DEBUG: Read {len(sheets)} sheets; {len(local_events)} events parsed locally, {len(chunks)} chunks for Gemini, {skipped_rows} rows unchanged")
+
+            # 3. Prompt Gemini per chunk for whatever is left
+            results, chunk_reports = await self.extract_chunks(chunks)
+            failed = [r for r in chunk_reports if "error" in r]
+            if chunks and len(failed) == len(chunks) and not local_events:
+                raise Exception(failed[0]["error"])
+
+            llm_events = [e for chunk_events in results if chunk_events for e in chunk_events]
+            groups = [{"rows": c["row_hashes"], "events": sorted({event_id(e) for e in r})}
+                      for c, r in zip(chunks, results) if r is not None and c["row_hashes"]]
+            events = dedupe_events(local_events + llm_events)
+            report = {
+                "sheets": len(sheets),
+                "local_events": len(local_events),
+                "llm_rows": sum(len(c["rows"]) for c in chunks),
+                "skipped_rows": skipped_rows,
+                "chunks": chunk_reports,
+                "failed_chunks": len(failed),
+                "seconds": round(time.perf_counter() - started, 3),
+            }
+            sources = {
+                "groups": kept + groups,
+                "stale": stale,
+                "local": sorted({event_id(e) for e in local_events}),
+            }
+            print(f"DEBUG: Parsed {len(events)} events ({len(failed)} failed chunks)")
+            return events, report, sources
 
         except Exception as e:
             print(f"DEBUG: ExcelProcessor Error: {e}")
             # Propagate specific error message up to the router
             raise Exception(f"{str(e)}")
 
+    async def process_schedule(self, file: UploadFile) -> tuple[list, dict]:
+        """
+        Extracts events from every sheet of an uploaded workbook.
+        Returns (de-duplicated events, report with per-chunk timings).
+        """
+        contents = await file.read()
+        events, report, _ = await self.process_contents(contents)
+        return events, report
+
 excel_processor = ExcelProcessor()
@@ -1,9 +1,50 @@
-import firebase_admin
-from firebase_admin import credentials, firestore
 import os
+import asyncio
+import functools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.services import metrics
 
 class FirebaseService:
+    """
+    Owns the Firestore client. It is created on first use rather than at import,
+    so a cold start that only serves e.g. GET /health never loads firebase_admin.
+    Assigning `db` (tests, benchmarks) replaces the client.
+    """
+
     def __init__(self):
+        self._db = None
+        self.initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def db(self):
+        if not self.initialized:
+            with self._lock:
+                if not self.initialized:
+                    self._db = self._connect()
+                    self.initialized = True
+        return self._db
+
+    @db.setter
+    def db(self, value):
+        self._db = value
+        self.initialized = True
+
+    def _connect(self):
+        # Local SQLite file instead of Firestore (offline runs, load tests)
+        local_path = os.getenv("LOCAL_DB_PATH")
+        if local_path:
+            from backend.services.sqlite_db import SQLiteFirestore
+            print(f"DEBUG: Using local SQLite store at {local_path}")
+            return SQLiteFirestore(local_path)
+
+        # Imported here: firebase_admin and the Google Cloud client take ~0.3s to import
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
         # Check if already initialized to avoid errors on reload
         if not firebase_admin._apps:
             # In production, use environment variables or a secure path
@@ -42,12 +83,101 @@ class FirebaseService:
                      print(f"Failed to initialize Firebase Default: {e}")
 
         try:
-            self.db = firestore.client()
+            return firestore.client()
         except Exception as e:
             print(f"Firestore client init failed: {e}")
-            self.db = None
+            return None
 
 db_service = FirebaseService()
 
 def get_db():
     return db_service.db
+
+# The firebase_admin Firestore client is synchronous. Its calls run on this
+# bounded pool so a DB round-trip doesn't stall the event loop.
+_db_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("FIRESTORE_MAX_WORKERS", 16)),
+    thread_name_prefix="firestore",
+)
+
+async def run_db(fn, *args, collection: str = "unknown", op: str = "read", docs: int | None = None, **kwargs):
+    """
+    Runs a blocking Firestore call in the DB thread pool and awaits its result.
+    Query streams must be consumed inside `fn`, e.g. `lambda: [d.to_dict() for d in q.stream()]`.
+
+    `collection` and `op` ("read", "write", "delete", "transaction") label the call's
+    metrics. Documents counted are `docs` if given, else len(result) for a list, else 1.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    try:
+        result = await loop.run_in_executor(_db_executor, functools.partial(fn, *args, **kwargs))
+    except Exception:
+        metrics.firestore_errors.inc(collection, op)
+        raise
+    finally:
+        metrics.firestore_seconds.observe(time.perf_counter() - started, collection, op)
+    metrics.firestore_documents.inc(collection, op, amount=docs if docs is not None else len(result) if isinstance(result, list) else 1)
+    return result
+
+def run_transaction(db, fn):
+    """
+    Runs fn(transaction) in a Firestore transaction, retried on contention, and returns its result.
+    Blocking; call it through run_db. In-memory stand-ins provide their own `run_transaction`.
+    """
+    if hasattr(db, "run_transaction"):
+        return db.run_transaction(fn)
+    from firebase_admin import firestore
+    return firestore.transactional(fn)(db.transaction())
+
+# Firestore rejects batches with more than 500 writes
+MAX_BATCH_WRITES = 500
+BATCH_CONCURRENCY = int(os.getenv("FIRESTORE_BATCH_CONCURRENCY", 4))
+BATCH_RETRIES = int(os.getenv("FIRESTORE_BATCH_RETRIES", 2))
+
+async def commit_in_batches(db, writes: list, batch_size: int = MAX_BATCH_WRITES,
+                            concurrency: int = BATCH_CONCURRENCY, retries: int = BATCH_RETRIES,
+                            collection: str = "unknown") -> list:
+    """
+    Commits `writes` ([("set" | "update" | "delete", doc_ref, data)]) in batches of at most
+    `batch_size`, with up to `concurrency` commits in flight. A failed batch is retried
+    `retries` times with jittered backoff; writes are idempotent, so a retry is safe.
+
+    Returns one report per batch, in order: {"index", "start", "writes", "attempts", "ok", "error"?},
+    where writes[start:start + writes] are the writes it covered.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_WRITES))
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    def commit(chunk: list):
+        batch = db.batch()
+        for kind, ref, data in chunk:
+            if kind == "set":
+                batch.set(ref, data)
+            elif kind == "update":
+                batch.update(ref, data)
+            elif kind == "delete":
+                batch.delete(ref)
+            else:
+                raise ValueError(f"Unknown write type: {kind}")
+        batch.commit()
+
+    async def run(index: int, start: int):
+        chunk = writes[start:start + batch_size]
+        report = {"index": index, "start": start, "writes": len(chunk), "attempts": 0, "ok": False}
+        async with sem:
+            for attempt in range(retries + 1):
+                report["attempts"] = attempt + 1
+                try:
+                    await run_db(commit, chunk, collection=collection, op="batch_write", docs=len(chunk))
+                    report["ok"] = True
+                    report.pop("error", None)
+                    break
+                except Exception as e:
+                    report["error"] = str(e)[:300]
+                    if attempt < retries:
+                        await asyncio.sleep((0.2 * 2 ** attempt) * (0.5 + random.random()))
+        return report
+
+    starts = range(0, len(writes), batch_size)
+    return list(await asyncio.gather(*(run(i, start) for i, start in enumerate(starts))))
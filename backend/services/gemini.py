@@ -1,6 +1,52 @@
 import httpx
 import os
 import json
+import asyncio
+import time
+import importlib.util
+from backend.services import metrics
+from backend.services.llm_cache import LLMCache
+from backend.services.single_flight import SingleFlight
+from backend.services.resilience import (
+    CircuitBreaker, CircuitOpenError, TokenBucket, backoff_delay, retry_after_seconds,
+)
+
+# Worth retrying: rate limited, or the upstream is temporarily unhealthy
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class SlotResponse:
+    """A streamed response that releases its concurrency slot when closed."""
+
+    def __init__(self, resp: httpx.Response, release):
+        self._resp = resp
+        self._release = release
+
+    def __getattr__(self, name):
+        return getattr(self._resp, name)
+
+    async def aclose(self):
+        try:
+            await self._resp.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release:
+                release()
+
 
 class GeminiService:
     def __init__(self):
@@ -10,35 +56,292 @@ class GeminiService:
         else:
             print("Warning: GEMINI_API_KEY not found.")
         # User explicitly requested 3.0 (preview)
-        self.model_name = "gemini-3-flash-preview" 
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
+        self.model_name = "gemini-3-flash-preview"
+        self.base_url = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/models")
+
+        # Connection pool settings (shared client, see startup/shutdown)
+        self.max_connections = _env_int("GEMINI_MAX_CONNECTIONS", 20)
+        self.max_keepalive_connections = _env_int("GEMINI_MAX_KEEPALIVE", 10)
+        self.keepalive_expiry = _env_float("GEMINI_KEEPALIVE_EXPIRY", 60.0)
+        self.connect_timeout = _env_float("GEMINI_CONNECT_TIMEOUT", 10.0)
+        self.read_timeout = _env_float("GEMINI_READ_TIMEOUT", 120.0)
+        # HTTP/2 needs the optional `h2` package (httpx[http2])
+        self.http2 = os.getenv("GEMINI_HTTP2", "1") != "0" and importlib.util.find_spec("h2") is not None
+
+        self._client: httpx.AsyncClient | None = None
 
-    async def generate_content(self, prompt: str) -> str:
+        # Response cache (in-memory LRU, optional disk tier via GEMINI_CACHE_DIR)
+        self.cache = LLMCache(
+            max_entries=_env_int("GEMINI_CACHE_MAX_ENTRIES", 256),
+            disk_dir=os.getenv("GEMINI_CACHE_DIR") or None,
+        )
+        # Identical prompts in flight at the same time share one request
+        self.flight = SingleFlight("gemini")
+
+        # Client-side limits, sized to the project's quota
+        self.max_concurrency = _env_int("GEMINI_MAX_CONCURRENCY", 8)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._waiting = 0
+        self.rate_limiter = TokenBucket(_env_float("GEMINI_RPM", 0))
+        # Retries on 429/5xx/network errors: jittered exponential backoff, honoring Retry-After
+        self.max_retries = _env_int("GEMINI_MAX_RETRIES", 3)
+        self.backoff_base = _env_float("GEMINI_BACKOFF_BASE", 0.5)
+        self.backoff_cap = _env_float("GEMINI_BACKOFF_CAP", 20.0)
+        # Fail fast while the upstream keeps failing
+        self.breaker = CircuitBreaker(
+            failure_threshold=_env_int("GEMINI_BREAKER_THRESHOLD", 5),
+            reset_timeout=_env_float("GEMINI_BREAKER_RESET", 30.0),
+            name="Gemini",
+        )
+
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+        timeout = httpx.Timeout(
+            self.read_timeout,
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+        )
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=self.http2)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created lazily as well, in case the app runs without lifespan events
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def startup(self):
+        """Opens the shared HTTP client ahead of the first call (benchmarks, warm-ups)."""
+        _ = self.client
+
+    async def shutdown(self):
+        """Closes the shared HTTP client and its pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def generate_content(self, prompt: str, cache_ttl: float | None = None) -> str:
+        """
+        Returns the model's text for `prompt`.
+        If `cache_ttl` (seconds) is given, identical prompts are served from cache for that long.
+        Concurrent calls with the same prompt share one upstream request.
+        """
         if not self.api_key:
              return "Error: Gemini API Key not found."
-             
+
+        cache_key = self.cache.make_key(self.model_name, prompt)
+        if cache_ttl:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        async def fetch() -> str:
+            text = await self._request(prompt)
+            # Never cache failures
+            if cache_ttl and not text.startswith("Error:"):
+                await self.cache.set(cache_key, text, cache_ttl)
+            return text
+
+        return await self.flight.do(cache_key, fetch)
+
+    def _retry_delay(self, attempt: int, resp: httpx.Response | None) -> float | None:
+        """
+        Seconds to wait before the next attempt: the server's Retry-After or
+        RetryInfo, else jittered backoff. None if the server asks for longer
+        than backoff_cap; retrying earlier would only get another 429.
+        """
+        delay = None
+        if resp is not None:
+            delay = retry_after_seconds(resp.headers.get("Retry-After"))
+            if delay is None:
+                delay = self._retry_info_delay(resp)
+        if delay is None:
+            return backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+        return delay if delay <= self.backoff_cap else None
+
+    def _retry_info_delay(self, resp: httpx.Response) -> float | None:
+        # Gemini 429s carry google.rpc.RetryInfo, e.g. {"retryDelay": "17s"}
+        try:
+            for detail in resp.json()["error"].get("details", []):
+                if "retryDelay" in detail:
+                    return float(str(detail["retryDelay"]).rstrip("s"))
+        except Exception:
+            pass
+        return None
+
+    async def _send(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        One upstream call through the limiter, retried on 429/5xx and network errors.
+        Raises CircuitOpenError while the breaker is open; returns the last response otherwise.
+        Streaming callers pass stream=True and must close the response, which
+        keeps its concurrency slot until then.
+        """
+        stream = kwargs.pop("stream", False)
+        attempt = 0
+        while True:
+            self.breaker.check()
+            resp = None
+            error = None
+            slot = False
+            try:
+                self._waiting += 1
+                try:
+                    await self._slots.acquire()
+                finally:
+                    self._waiting -= 1
+                slot = True
+                await self.rate_limiter.acquire()
+                request = self.client.build_request(method, url, **kwargs)
+                resp = await self.client.send(request, stream=stream)
+            except httpx.TransportError as e:
+                error = e
+            except BaseException:
+                if slot:
+                    self._slots.release()
+                self.breaker.abandon()
+                raise
+
+            if resp is not None and resp.status_code not in RETRYABLE_STATUSES:
+                # A 4xx other than 429 is our request's problem, not the upstream's
+                self.breaker.record_success()
+                if stream:
+                    # The body is read after we return: the slot is held until the caller closes it
+                    return SlotResponse(resp, self._slots.release)
+                self._slots.release()
+                return resp
+            self._slots.release()
+            self.breaker.record_failure()
+            if attempt >= self.max_retries:
+                if error:
+                    raise error
+                return resp
+
+            delay = self._retry_delay(attempt, resp)
+            if delay is None:
+                # The server asked for a longer wait than we are willing to hold the caller
+                return resp
+            status = resp.status_code if resp is not None else type(error).__name__
+            metrics.gemini_retries.inc(str(status))
+            if resp is not None:
+                await resp.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _record_usage(self, endpoint: str, result: dict):
+        usage = result.get("usageMetadata") or {}
+        for kind, field in (("prompt", "promptTokenCount"), ("response", "candidatesTokenCount"),
+                            ("thoughts", "thoughtsTokenCount"), ("cached", "cachedContentTokenCount")):
+            if usage.get(field):
+                metrics.gemini_tokens.inc(endpoint, kind, amount=usage[field])
+
+    async def _request(self, prompt: str) -> str:
         url = f"{self.base_url}/{self.model_name}:generateContent?key={self.api_key}"
         headers = {"Content-Type": "application/json"}
         data = {
             "contents": [{"parts": [{"text": prompt}]}]
         }
-        
-        async with httpx.AsyncClient() as client:
+
+        metrics.gemini_prompt_bytes.observe(len(prompt.encode("utf-8")), "generate")
+        started = time.perf_counter()
+        outcome = "exception"
+        try:
+            resp = await self._send("POST", url, json=data, headers=headers)
+
+            if resp.status_code != 200:
+                outcome = "http_error"
+                return f"Error: API Request Failed ({resp.status_code}) - {resp.text}"
+
+            result = resp.json()
+            self._record_usage("generate", result)
+            # Parse response structure
+            try:
+                text = result['candidates'][0]['content']['parts'][0]['text']
+            except (KeyError, IndexError):
+                outcome = "bad_response"
+                return f"Error: Unexpected API Response format - {result}"
+            outcome = "ok"
+            metrics.gemini_response_bytes.observe(len(text.encode("utf-8")), "generate")
+            return text
+
+        except CircuitOpenError as e:
+            outcome = "circuit_open"
+            return f"Error: Gemini {e}"
+        except Exception as e:
+            print(f"Error calling Gemini via REST: {e}")
+            return f"Error: {str(e)}"
+        finally:
+            metrics.gemini_request_seconds.observe(time.perf_counter() - started, "generate", outcome)
+
+    def upstream_stats(self) -> dict:
+        return {
+            "breaker": self.breaker.stats(),
+            "concurrency": {
+                "max": self.max_concurrency,
+                "waiting": self._waiting,
+            },
+            "rate_limit": self.rate_limiter.stats(),
+        }
+
+    async def stream_content(self, prompt: str):
+        """
+        Streams the model's text via `streamGenerateContent` (SSE), yielding chunks as they arrive.
+        Raises on configuration or upstream errors instead of returning an "Error:" string.
+        """
+        if not self.api_key:
+            raise RuntimeError("Gemini API Key not found.")
+
+        url = f"{self.base_url}/{self.model_name}:streamGenerateContent?alt=sse&key={self.api_key}"
+        data = {
+            "contents": [{"parts": [{"text": prompt}]}]
+        }
+
+        metrics.gemini_prompt_bytes.observe(len(prompt.encode("utf-8")), "stream")
+        started = time.perf_counter()
+        outcome = "exception"
+        received = 0
+        usage = None
+        try:
+            try:
+                resp = await self._send("POST", url, json=data, stream=True)
+            except CircuitOpenError as e:
+                outcome = "circuit_open"
+                raise RuntimeError(f"Gemini {e}")
+
             try:
-                resp = await client.post(url, json=data, timeout=120.0)
-                
                 if resp.status_code != 200:
-                    return f"Error: API Request Failed ({resp.status_code}) - {resp.text}"
-                    
-                result = resp.json()
-                # Parse response structure
-                try:
-                    return result['candidates'][0]['content']['parts'][0]['text']
-                except (KeyError, IndexError):
-                    return f"Error: Unexpected API Response format - {result}"
-                    
-            except Exception as e:
-                print(f"Error calling Gemini via REST: {e}")
-                return f"Error: {str(e)}"
+                    outcome = "http_error"
+                    body = (await resp.aread()).decode("utf-8", "replace")
+                    raise RuntimeError(f"API Request Failed ({resp.status_code}) - {body}")
+
+                async for line in resp.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if not payload:
+                        continue
+                    try:
+                        result = json.loads(payload)
+                        # Usage totals are repeated per chunk; the last one is final
+                        usage = result.get("usageMetadata") or usage
+                        parts = result['candidates'][0]['content']['parts']
+                    except (ValueError, KeyError, IndexError, AttributeError):
+                        continue
+                    text = "".join(p.get("text", "") for p in parts)
+                    if text:
+                        received += len(text.encode("utf-8"))
+                        yield text
+                outcome = "ok"
+            finally:
+                await resp.aclose()
+        finally:
+            metrics.gemini_request_seconds.observe(time.perf_counter() - started, "stream", outcome)
+            if outcome == "ok":
+                metrics.gemini_response_bytes.observe(received, "stream")
+            if usage:
+                self._record_usage("stream", {"usageMetadata": usage})
 
 gemini_service = GeminiService()
@@ -0,0 +1,223 @@
+import bisect
+import os
+import threading
+import time
+
+# Set METRICS_ENABLED=0 to turn recording off (GET /metrics then returns 404)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        if not METRICS_ENABLED:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for values, total in items:
+            lines.append(f"{self.name}{_labels(self.label_names, values)} {_number(total)}")
+        return lines
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. `observe` is a bisect and a few additions under a
+    lock, cheap enough for every request; buckets are made cumulative at scrape time.
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        if not METRICS_ENABLED:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, [list(s[0]), s[1], s[2]]) for labels, s in self._series.items())
+        for values, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, values)} {count}")
+        return lines
+
+
+class Registry:
+    """
+    Metrics in Prometheus text format. Besides the recorded metrics, collectors
+    registered with `add_collector` are called at scrape time and return
+    [(name, type, help, [(labels dict, value)])]; that is how the caches'
+    existing counters are exported without touching their hot paths.
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+        # Collectors whose last call failed; a failure is logged when it starts, not on every scrape
+        self._failing = set()
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collect):
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception as e:
+                if collect not in self._failing:
+                    self._failing.add(collect)
+                    print(f"DEBUG: metrics collector failed: {e}")
+                continue
+            self._failing.discard(collect)
+            for name, kind, help, samples in families:
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    names = tuple(labels)
+                    lines.append(f"{name}{_labels(names, tuple(labels[n] for n in names))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+gemini_request_seconds = registry.histogram(
+    "gemini_request_duration_seconds", "Gemini call latency, including retries.",
+    ("endpoint", "outcome"),
+)
+gemini_prompt_bytes = registry.histogram(
+    "gemini_prompt_bytes", "Prompt size sent to Gemini (UTF-8 bytes).", ("endpoint",), SIZE_BUCKETS,
+)
+gemini_response_bytes = registry.histogram(
+    "gemini_response_bytes", "Response text size received from Gemini (UTF-8 bytes).", ("endpoint",), SIZE_BUCKETS,
+)
+gemini_tokens = registry.counter(
+    "gemini_tokens_total", "Tokens reported in Gemini usageMetadata.", ("endpoint", "kind"),
+)
+gemini_retries = registry.counter(
+    "gemini_retries_total", "Gemini attempts retried, by reason.", ("reason",),
+)
+prompt_tokens = registry.histogram(
+    "prompt_tokens_estimated", "Estimated tokens per prompt built, by app endpoint.", ("endpoint",), TOKEN_BUCKETS,
+)
+prompt_truncated_lines = registry.counter(
+    "prompt_truncated_lines_total", "Lines left out to fit a prompt's token budget.", ("endpoint", "section"),
+)
+firestore_seconds = registry.histogram(
+    "firestore_operation_duration_seconds", "Firestore call latency (run_db), by collection and operation.",
+    ("collection", "op"),
+)
+firestore_documents = registry.counter(
+    "firestore_documents_total", "Documents read or written, by collection and operation.",
+    ("collection", "op"),
+)
+firestore_errors = registry.counter(
+    "firestore_errors_total", "Firestore calls that raised, by collection and operation.",
+    ("collection", "op"),
+)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording http_request_duration_seconds. Routes are
+    labelled by their path template ("/tasks/{task_id}"), never the raw path,
+    so the number of series stays bounded. Streaming responses are timed to
+    their last byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _route(scope) -> str:
+        # The router leaves the matched route in the (shared) scope
+        route = scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_request_seconds.observe(
+                time.perf_counter() - started, scope["method"], self._route(scope), str(status),
+            )
@@ -0,0 +1,129 @@
+import math
+import re
+
+from backend.services import metrics
+
+# Rough Gemini token estimate: ~4 characters per token for ASCII text, ~1.5
+# characters per token for Hangul and other scripts. Good enough for budgets;
+# exact counts from usageMetadata are in gemini_tokens_total.
+ASCII_CHARS_PER_TOKEN = 4.0
+OTHER_CHARS_PER_TOKEN = 1.5
+
+# No single line (a task, an event, a spreadsheet row) may take more than this
+MAX_LINE_TOKENS = 120
+
+_SPACES = re.compile(r"[ \t ]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ch < "\x80")
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN + (len(text) - ascii_chars) / OTHER_CHARS_PER_TOKEN)
+
+
+def compact(text: str) -> str:
+    """Strips indentation and trailing spaces, collapses runs of spaces and blank lines."""
+    lines = [_SPACES.sub(" ", line).strip() for line in text.strip().splitlines()]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines))
+
+
+def clip(text: str, max_tokens: int) -> str:
+    """Cuts `text` to about `max_tokens`, marking the cut with "…"."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    low, high = 0, len(text)
+    # Longest prefix that fits, leaving room for the marker
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) < max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low].rstrip() + "…"
+
+
+def chunk_by_budget(items: list, cost, max_tokens: int, max_items: int) -> list:
+    """
+    Splits `items` in order into chunks of at most `max_items` whose `cost(item)`
+    totals stay within `max_tokens`. An item over the budget on its own gets its own chunk.
+    """
+    chunks = []
+    current = []
+    used = 0
+    for item in items:
+        item_cost = cost(item)
+        if current and (len(current) >= max_items or used + item_cost > max_tokens):
+            chunks.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += item_cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def record(endpoint: str, prompt: str) -> str:
+    """Records the prompt's estimated size for `endpoint` and returns it unchanged."""
+    metrics.prompt_tokens.observe(estimate_tokens(prompt), endpoint)
+    return prompt
+
+
+class PromptBuilder:
+    """
+    Assembles a prompt from fixed text and prioritized sections within a token budget.
+
+    Fixed text (instructions, headers) is always kept. Sections are rendered
+    in the order they were added, but filled by priority (lower first): each
+    takes whole lines, in order, while the budget lasts, and says how many it
+    left out. The same data therefore always gives the same prompt, which also
+    keeps the LLM cache effective. Whitespace is compacted throughout.
+    """
+
+    def __init__(self, endpoint: str, max_tokens: int, max_line_tokens: int = MAX_LINE_TOKENS):
+        self.endpoint = endpoint
+        self.max_tokens = max_tokens
+        self.max_line_tokens = max_line_tokens
+        # ("text", str) | ("section", dict)
+        self._parts = []
+
+    def text(self, text: str) -> "PromptBuilder":
+        self._parts.append(("text", compact(text)))
+        return self
+
+    def section(self, key: str, title: str, lines: list, priority: int, empty: str = "None") -> "PromptBuilder":
+        """`key` is a stable name for metrics labels; `title` is what the prompt shows and may change (dates)."""
+        lines = [clip(compact(line), self.max_line_tokens) for line in lines if line and line.strip()]
+        self._parts.append(("section", {"key": key, "title": title, "lines": lines, "priority": priority, "empty": empty}))
+        return self
+
+    def build(self) -> str:
+        sections = [part for kind, part in self._parts if kind == "section"]
+        # Fixed text, section titles, and "None"/"omitted" placeholders come first
+        used = sum(estimate_tokens(part) + 1 for kind, part in self._parts if kind == "text")
+        used += sum(estimate_tokens(s["title"]) + estimate_tokens(s["empty"]) + 2 for s in sections)
+
+        for section in sorted(sections, key=lambda s: s["priority"]):
+            kept = 0
+            for line in section["lines"]:
+                cost = estimate_tokens(line) + 1
+                if used + cost > self.max_tokens:
+                    break
+                used += cost
+                kept += 1
+            section["kept"] = kept
+            if kept < len(section["lines"]):
+                metrics.prompt_truncated_lines.inc(self.endpoint, section["key"], amount=len(section["lines"]) - kept)
+
+        rendered = []
+        for kind, part in self._parts:
+            if kind == "text":
+                rendered.append(part)
+                continue
+            body = part["lines"][:part["kept"]]
+            omitted = len(part["lines"]) - part["kept"]
+            if omitted:
+                body.append(f"(+{omitted} more omitted)")
+            rendered.append(part["title"] + "\n" + ("\n".join(body) or part["empty"]))
+        return record(self.endpoint, "\n\n".join(rendered))
@@ -0,0 +1,140 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """
+    Requests-per-minute limiter: `rate_per_minute` tokens refill continuously,
+    up to `burst`. `acquire` waits for a token. A rate of 0 disables it.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int | None = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_minute // 6) or 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                wait = (1 - self._tokens) / self.rate
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+
+    def stats(self) -> dict:
+        if self.rate <= 0:
+            return {"enabled": False}
+        self._refill()
+        return {
+            "enabled": True,
+            "rate_per_minute": round(self.rate * 60, 2),
+            "tokens": round(self._tokens, 2),
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, retry_in: float):
+        super().__init__(f"upstream unavailable, circuit open (retry in {retry_in:.0f}s)")
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; calls then
+    fail fast for `reset_timeout` seconds. half_open lets one probe through:
+    success closes the circuit, failure opens it again. State changes are
+    logged once each; individual failures are only counted.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, name: str = "circuit"):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: float | None = None
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.opens = 0
+
+    def check(self):
+        """Raises CircuitOpenError if calls should fail fast right now."""
+        if self.state == "open":
+            retry_in = self.reset_timeout - (time.monotonic() - self.opened_at)
+            if retry_in > 0:
+                self.rejected += 1
+                raise CircuitOpenError(retry_in)
+            self._set_state("half_open")
+        if self.state == "half_open":
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(0)
+            self._probe_in_flight = True
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"DEBUG: {self.name} circuit {self.state} -> {state}")
+            self.state = state
+
+    def record_success(self):
+        self._set_state("closed")
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+            self._set_state("open")
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def abandon(self):
+        """The checked call ended without an outcome (e.g. cancelled); let another probe through."""
+        self._probe_in_flight = False
+
+    def stats(self) -> dict:
+        stats = {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+        if self.state == "open":
+            stats["retry_in"] = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 1)
+        return stats
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def retry_after_seconds(value: str | None) -> float | None:
+    """Parses a Retry-After header (seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
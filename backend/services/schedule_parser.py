@@ -0,0 +1,220 @@
+import re
+from datetime import date, datetime, time, timedelta
+
+# Header keywords per event field, checked in this order (more specific fields first).
+# A column is assigned to the first field whose keyword it contains.
+HEADER_KEYWORDS = [
+    ("date", ["날짜", "일자", "일시", "월일", "date"]),
+    ("time", ["시간", "시각", "time"]),
+    ("location", ["장소", "위치", "location", "place", "venue"]),
+    ("participants", ["대상", "참석", "참가", "participants", "attendees", "target"]),
+    ("manager", ["담당", "책임", "주관", "manager", "owner", "charge"]),
+    ("note", ["비고", "메모", "참고", "note", "remark", "memo"]),
+    ("type", ["구분", "유형", "종류", "type", "category"]),
+    ("title", ["행사", "제목", "내용", "일정", "업무", "title", "event", "subject"]),
+]
+
+# How many leading rows are searched for the header row
+HEADER_SCAN_ROWS = 10
+
+EXCEL_EPOCH = date(1899, 12, 30)
+
+_WEEKDAY = re.compile(r"\(\s*[월화수목금토일]\s*\)|\(\s*(mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?\s*\)", re.IGNORECASE)
+_YMD = re.compile(r"^(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*일?\.?$")
+_MD = re.compile(r"^(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*일?\.?$")
+_YYMD = re.compile(r"^(\d{2})\s*[.]\s*(\d{1,2})\s*[.]\s*(\d{1,2})\.?$")
+_TRAILING_TIME = re.compile(r"\s+(\d{1,2}):(\d{2})(:\d{2})?$")
+
+
+def _norm_header(value) -> str:
+    return re.sub(r"\s+", "", str(value or "")).lower()
+
+
+def detect_columns(row: list) -> dict:
+    """Maps event fields to column indexes using header keywords."""
+    columns = {}
+    for idx, cell in enumerate(row):
+        text = _norm_header(cell)
+        if not text or len(text) > 20:
+            continue
+        for field, keywords in HEADER_KEYWORDS:
+            if field not in columns and any(k in text for k in keywords):
+                columns[field] = idx
+                break
+    return columns
+
+
+def find_header(rows: list) -> tuple[int, dict] | None:
+    """Returns (row index, column map) of the most header-like leading row, if it has date and title."""
+    best = None
+    for i, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+        columns = detect_columns(row)
+        if "date" in columns and "title" in columns:
+            if best is None or len(columns) > len(best[1]):
+                best = (i, columns)
+    return best
+
+
+def normalize_date(value, default_year: int) -> str | None:
+    """
+    Normalizes Excel dates to YYYY-MM-DD.
+    Handles datetime/date cells, Excel serial numbers and strings like
+    "2025-03-04", "2025.3.4.", "25.3.4", "2025년 3월 4일", "3월 4일(화)", "3/4".
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Excel serial date (roughly 1954..2119)
+        if 20000 <= value <= 80000:
+            return (EXCEL_EPOCH + timedelta(days=int(value))).isoformat()
+        return None
+
+    text = _WEEKDAY.sub("", str(value)).strip()
+    # "2025-03-04 00:00:00" style strings; date_cell_time reads the time
+    text = _TRAILING_TIME.sub("", text)
+    try:
+        m = _YMD.match(text)
+        if m:
+            return date(int(m.group(1)), int(m.group(2)), int(m.group(3))).isoformat()
+        m = _YYMD.match(text)
+        if m:
+            return date(2000 + int(m.group(1)), int(m.group(2)), int(m.group(3))).isoformat()
+        m = _MD.match(text)
+        if m:
+            return date(default_year, int(m.group(1)), int(m.group(2))).isoformat()
+    except ValueError:
+        return None
+    return None
+
+
+def date_cell_time(value) -> str | None:
+    """
+    "HH:MM" of a date cell that also holds the time ("일시" columns): a datetime
+    cell, an Excel serial with a fraction, or "2026.3.5 09:30". None if there
+    is no time of day (midnight counts as none).
+    """
+    if isinstance(value, datetime):
+        value = value.time()
+        return value.strftime("%H:%M") if value != time(0, 0) else None
+    if isinstance(value, float) and not value.is_integer():
+        minutes = round((value % 1) * 24 * 60)
+        return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}" if minutes % (24 * 60) else None
+    if isinstance(value, str):
+        m = _TRAILING_TIME.search(_WEEKDAY.sub("", value).strip())
+        if m and (int(m.group(1)), int(m.group(2))) != (0, 0):
+            return f"{int(m.group(1)):02d}:{m.group(2)}"
+    return None
+
+
+def normalize_time(value) -> str:
+    if value is None or str(value).strip() == "":
+        return "All Day"
+    if isinstance(value, datetime):
+        value = value.time()
+    if isinstance(value, time):
+        return value.strftime("%H:%M")
+    if isinstance(value, float) and 0 <= value < 1:
+        # Excel time fraction
+        minutes = round(value * 24 * 60)
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    text = str(value).strip()
+    if text in ("종일", "하루종일", "전일"):
+        return "All Day"
+    return text
+
+
+def normalize_type(value, title: str) -> str:
+    text = f"{value or ''} {title}".lower()
+    if "출장" in text or "trip" in text:
+        return "trip"
+    if "개인" in text or "personal" in text:
+        return "personal"
+    return "official"
+
+
+def _cell(row: list, columns: dict, field: str):
+    idx = columns.get(field)
+    if idx is None or idx >= len(row):
+        return None
+    return row[idx]
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return " ".join(str(value).split())
+
+
+def parse_sheet(sheet: dict, default_year: int | None = None) -> tuple[list, dict | None]:
+    """
+    Parses a sheet ({"sheet", "header", "rows"}) locally.
+    Returns (events, leftover sheet with the rows that need the LLM, or None).
+    A sheet without a recognizable header is returned whole as leftover.
+    """
+    rows = [sheet["header"]] + sheet["rows"]
+    found = find_header(rows)
+    if not found:
+        return [], sheet
+
+    header_idx, columns = found
+    year = default_year or datetime.now().year
+    events = []
+    leftover = []
+    last_date = None
+
+    for row in rows[header_idx + 1:]:
+        title = _text(_cell(row, columns, "title"))
+        raw_date = _cell(row, columns, "date")
+        if not title:
+            # Empty or separator row; date-only rows just advance the carried date
+            parsed = normalize_date(raw_date, year)
+            if parsed:
+                last_date = parsed
+            elif sum(1 for c in row if _text(c)) >= 2:
+                # Data in unexpected columns; single-cell rows are section labels like "3월"
+                leftover.append(row)
+            continue
+
+        if raw_date is None or _text(raw_date) == "":
+            # Merged date cells: only the first row of the block carries the value
+            parsed = last_date
+        else:
+            parsed = normalize_date(raw_date, year)
+            # Month/day without a year: a school year wraps from December into January
+            if parsed and last_date and (date.fromisoformat(last_date) - date.fromisoformat(parsed)).days > 180:
+                rolled = normalize_date(raw_date, year + 1)
+                if rolled != parsed:
+                    parsed = rolled
+
+        if not parsed:
+            leftover.append(row)
+            continue
+
+        last_date = parsed
+        year = int(parsed[:4])
+        raw_time = _cell(row, columns, "time")
+        if raw_time is None or _text(raw_time) == "":
+            # No time column, or an empty one: the date cell may carry the time ("일시")
+            time_text = date_cell_time(raw_date) or "All Day"
+        else:
+            time_text = normalize_time(raw_time)
+        events.append({
+            "title": title,
+            "date": parsed,
+            "time": time_text,
+            "location": _text(_cell(row, columns, "location")),
+            "participants": _text(_cell(row, columns, "participants")),
+            "manager": _text(_cell(row, columns, "manager")),
+            "type": normalize_type(_cell(row, columns, "type"), title),
+            "note": _text(_cell(row, columns, "note")),
+        })
+
+    if not leftover:
+        return events, None
+    return events, {"sheet": sheet["sheet"], "header": rows[header_idx], "rows": leftover}
@@ -0,0 +1,32 @@
+import json
+import os
+from importlib.util import find_spec
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# "orjson" (default, if installed) or "json" for the standard library encoder
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson")
+USE_ORJSON = JSON_ENCODER == "orjson" and find_spec("orjson") is not None
+
+if USE_ORJSON:
+    import orjson
+
+
+def _default(value):
+    # Types neither encoder knows (e.g. pydantic models) go through FastAPI's encoder
+    return jsonable_encoder(value)
+
+
+def dumps(data) -> bytes:
+    """Compact UTF-8 JSON with the configured encoder."""
+    if USE_ORJSON:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default response class: renders with `dumps` instead of json.dumps."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
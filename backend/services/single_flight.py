@@ -0,0 +1,125 @@
+import asyncio
+
+# Every SingleFlight by name, for /health
+flights: dict[str, "SingleFlight"] = {}
+
+
+class Broadcast:
+    """Chunks of one in-flight stream; every subscriber gets all of them from the start."""
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+        self._changed = asyncio.Event()
+
+    def publish(self, chunk):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def close(self):
+        self.closed = True
+        self._notify()
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def subscribe(self):
+        seen = 0
+        while True:
+            changed = self._changed
+            while seen < len(self.chunks):
+                yield self.chunks[seen]
+                seen += 1
+            if self.closed:
+                return
+            await changed.wait()
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls with the same key share one in-flight
+    computation and all receive its result (or its exception).
+
+    The computation runs as its own task, so a caller that goes away (e.g. a
+    closed browser tab) doesn't cancel it for the others. Nothing is kept
+    once it finishes; caching is left to the caller.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: dict = {}
+        # Broadcasts of computations started with `stream`
+        self._broadcasts: dict = {}
+        self.started = 0
+        self.coalesced = 0
+        self.errors = 0
+        flights[name] = self
+
+    def in_flight(self, key) -> bool:
+        return key in self._in_flight
+
+    async def do(self, key, fn):
+        """Returns `await fn()`, sharing the call with any concurrent caller using the same key."""
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.started += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        return await asyncio.shield(task)
+
+    async def stream(self, key, produce):
+        """
+        Like `do`, for a computation that streams: `produce(publish)` calls
+        publish(chunk) as chunks arrive and returns the final result (what
+        `do` callers joining it receive). Yields the chunks, replayed from the
+        start for callers that join late, then raises the computation's
+        exception if it failed. Joining a computation started by `do` yields
+        its result as a single chunk.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            broadcast = self._broadcasts.get(key)
+        else:
+            self.started += 1
+            broadcast = Broadcast()
+
+            async def run():
+                try:
+                    return await produce(broadcast.publish)
+                finally:
+                    broadcast.close()
+
+            task = asyncio.ensure_future(run())
+            self._in_flight[key] = task
+            self._broadcasts[key] = broadcast
+            task.add_done_callback(lambda t: self._finished(key, t))
+
+        if broadcast is None:
+            yield await asyncio.shield(task)
+            return
+        async for chunk in broadcast.subscribe():
+            yield chunk
+        await asyncio.shield(task)
+
+    def _finished(self, key, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            self._broadcasts.pop(key, None)
+        # Retrieve the exception so it isn't reported as unhandled when every caller left
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        total = self.started + self.coalesced
+        return {
+            "in_flight": len(self._in_flight),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "coalesced_ratio": round(self.coalesced / total, 3) if total else 0.0,
+        }
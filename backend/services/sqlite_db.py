@@ -0,0 +1,304 @@
+"""
+SQLite-backed stand-in for the subset of the firebase_admin Firestore client
+this API uses (collections, documents, where/order_by/limit/start_after/select
+queries, batches, transactions, get_all).
+
+Set LOCAL_DB_PATH=/path/to/dashboard.db to use it instead of Firestore, e.g.
+to run offline or load-test at realistic data sizes with data that survives
+restarts. Every router then takes its normal Firestore path.
+
+Documents are JSON rows in one table keyed by (collection, id). Filters and
+ordering are pushed down to SQL via json_extract, with expression indexes on
+the fields the API queries (uid, date, is_deleted, file_hash).
+"""
+import copy
+import json
+import re
+import sqlite3
+import threading
+import uuid
+
+INDEXED_FIELDS = ["uid", "date", "is_deleted", "file_hash"]
+
+_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_OPS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+def _field_sql(field: str) -> str:
+    if field == "__name__":
+        return "id"
+    if not _FIELD.match(field):
+        raise ValueError(f"Unsupported field path: {field}")
+    return f"json_extract(data, '$.{field}')"
+
+
+def _param(value):
+    # json_extract returns JSON booleans as 0/1
+    return int(value) if isinstance(value, bool) else value
+
+
+class SQLiteSnapshot:
+    def __init__(self, ref, data):
+        self.reference = ref
+        self.id = ref.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class SQLiteDocumentRef:
+    def __init__(self, collection, doc_id):
+        self._collection = collection
+        self._client = collection._client
+        self.id = doc_id
+
+    def get(self, transaction=None):
+        rows = self._client._query(
+            "SELECT data FROM docs WHERE collection = ? AND id = ?", (self._collection.name, self.id)
+        )
+        return SQLiteSnapshot(self, json.loads(rows[0][0]) if rows else None)
+
+    def set(self, data, merge=False):
+        with self._client._write():
+            self._set(data, merge)
+
+    def update(self, data):
+        with self._client._write():
+            self._update(data)
+
+    def delete(self):
+        with self._client._write():
+            self._delete()
+
+    def _set(self, data, merge=False):
+        if merge:
+            current = self.get().to_dict()
+            if current is not None:
+                current.update(data)
+                data = current
+        self._client._conn.execute(
+            "INSERT OR REPLACE INTO docs (collection, id, data) VALUES (?, ?, ?)",
+            (self._collection.name, self.id, json.dumps(data, ensure_ascii=False, default=str)),
+        )
+
+    def _update(self, data):
+        current = self.get().to_dict()
+        if current is None:
+            raise KeyError(f"No document to update: {self._collection.name}/{self.id}")
+        current.update(data)
+        self._set(current)
+
+    def _delete(self):
+        self._client._conn.execute(
+            "DELETE FROM docs WHERE collection = ? AND id = ?", (self._collection.name, self.id)
+        )
+
+
+class SQLiteQuery:
+    def __init__(self, collection, filters=None, orders=None, limit_=None, offset_=0, start_after_=None, fields=None):
+        self._collection = collection
+        self._filters = filters or []
+        self._orders = orders or []
+        self._limit = limit_
+        self._offset = offset_
+        self._start_after = start_after_
+        self._fields = fields
+
+    def _copy(self, **kw):
+        args = dict(filters=list(self._filters), orders=list(self._orders), limit_=self._limit,
+                    offset_=self._offset, start_after_=self._start_after, fields=self._fields)
+        args.update(kw)
+        return SQLiteQuery(self._collection, **args)
+
+    def where(self, field, op, value):
+        if op not in _OPS and op != "in":
+            raise ValueError(f"Unsupported operator: {op}")
+        return self._copy(filters=self._filters + [(field, op, value)])
+
+    def order_by(self, field, direction="ASCENDING"):
+        return self._copy(orders=self._orders + [(field, str(direction).upper().startswith("DESC"))])
+
+    def limit(self, n):
+        return self._copy(limit_=n)
+
+    def offset(self, n):
+        return self._copy(offset_=n)
+
+    def start_after(self, values):
+        return self._copy(start_after_=values)
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def _sql(self) -> tuple[str, list]:
+        where = ["collection = ?"]
+        params = [self._collection.name]
+        for field, op, value in self._filters:
+            column = _field_sql(field)
+            if op == "in":
+                where.append(f"{column} IN ({', '.join('?' for _ in value)})")
+                params.extend(_param(v) for v in value)
+            elif value is None and op in ("==", "!="):
+                where.append(f"{column} IS {'NOT ' if op == '!=' else ''}NULL")
+            else:
+                where.append(f"{column} {_OPS[op]} ?")
+                params.append(_param(value))
+
+        orders = list(self._orders)
+        if self._start_after is not None:
+            if len({desc for _, desc in orders}) > 1:
+                raise ValueError("start_after needs all order_by directions to match")
+            if isinstance(self._start_after, dict):
+                values = [self._start_after.get(f) for f, _ in orders]
+            else:
+                values = list(self._start_after)
+            columns = [_field_sql(f) for f, _ in orders[:len(values)]]
+            op = "<" if orders and orders[0][1] else ">"
+            where.append(f"({', '.join(columns)}) {op} ({', '.join('?' for _ in values)})")
+            params.extend(_param(v) for v in values)
+
+        order_sql = [f"{_field_sql(f)} {'DESC' if desc else 'ASC'}" for f, desc in orders]
+        if not any(f == "__name__" for f, _ in orders):
+            order_sql.append("id ASC")
+        sql = f"SELECT id, data FROM docs WHERE {' AND '.join(where)} ORDER BY {', '.join(order_sql)}"
+        if self._limit is not None or self._offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([self._limit if self._limit is not None else -1, self._offset])
+        return sql, params
+
+    def stream(self):
+        sql, params = self._sql()
+        rows = self._collection._client._query(sql, params)
+        for doc_id, raw in rows:
+            data = json.loads(raw)
+            if self._fields is not None:
+                data = {f: data[f] for f in self._fields if f in data}
+            yield SQLiteSnapshot(SQLiteDocumentRef(self._collection, doc_id), data)
+
+    def get(self):
+        return list(self.stream())
+
+
+class SQLiteCollection(SQLiteQuery):
+    def __init__(self, client, name):
+        self._client = client
+        self.name = name
+        super().__init__(self)
+
+    def document(self, doc_id=None):
+        return SQLiteDocumentRef(self, doc_id or uuid.uuid4().hex[:20])
+
+    def list_documents(self):
+        rows = self._client._query("SELECT id FROM docs WHERE collection = ?", (self.name,))
+        return [SQLiteDocumentRef(self, row[0]) for row in rows]
+
+
+class SQLiteBatch:
+    """Buffers writes and applies them in one SQLite transaction on commit."""
+
+    def __init__(self, client):
+        self._client = client
+        self._ops = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(lambda: ref._set(copy.deepcopy(data), merge))
+
+    def update(self, ref, data):
+        self._ops.append(lambda: ref._update(copy.deepcopy(data)))
+
+    def delete(self, ref):
+        self._ops.append(ref._delete)
+
+    def commit(self):
+        if len(self._ops) > 500:
+            raise ValueError("maximum 500 writes allowed per request")
+        with self._client._write():
+            for op in self._ops:
+                op()
+        self._ops = []
+
+
+class SQLiteTransaction(SQLiteBatch):
+    pass
+
+
+class SQLiteFirestore:
+    def __init__(self, path: str):
+        self.path = path
+        # One connection shared by the DB thread pool; the lock serializes access
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.RLock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs ("
+                "collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, "
+                "PRIMARY KEY (collection, id))"
+            )
+            for field in INDEXED_FIELDS:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS docs_{field} ON docs (collection, {_field_sql(field)})"
+                )
+
+    def _query(self, sql, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _write(self):
+        return _WriteTransaction(self)
+
+    def collection(self, name):
+        return SQLiteCollection(self, name)
+
+    def batch(self):
+        return SQLiteBatch(self)
+
+    def transaction(self):
+        return SQLiteTransaction(self)
+
+    def run_transaction(self, fn):
+        """Runs fn(transaction) with the database locked, so its reads and writes are serializable."""
+        with self._lock:
+            transaction = self.transaction()
+            result = fn(transaction)
+            transaction.commit()
+            return result
+
+    def get_all(self, refs):
+        for ref in refs:
+            yield ref.get()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _WriteTransaction:
+    """BEGIN IMMEDIATE ... COMMIT under the client lock; nested uses join the outer one."""
+
+    def __init__(self, client):
+        self._client = client
+        self._outer = False
+
+    def __enter__(self):
+        self._client._lock.acquire()
+        self._outer = not self._client._conn.in_transaction
+        if self._outer:
+            self._client._conn.execute("BEGIN IMMEDIATE")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self._outer:
+                self._client._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self._client._lock.release()
@@ -1,3 +1,132 @@
-demo_tasks = []
-demo_events = []
-demo_memos = []
+import copy
+import threading
+from bisect import bisect_left, bisect_right, insort
+
+
+class DemoStore:
+    """
+    In-memory store used when Firestore isn't configured (demo mode).
+
+    Tasks are indexed by id and by uid, events by id and by date (a sorted
+    list of (date, id) pairs, so ranges are two bisects), memos by uid.
+    One re-entrant lock guards every read and write: routers call in from
+    the event loop and from worker threads. Reads return copies.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self._tasks: dict[str, dict] = {}
+        self._tasks_by_uid: dict[str, set[str]] = {}
+        self._events: dict[str, dict] = {}
+        self._event_dates: list[tuple[str, str]] = []
+        self._memos: dict[str, list] = {}
+        self._memo_versions: dict[str, int] = {}
+        # Schedule import fingerprints, keyed by source file name
+        self._imports: dict[str, dict] = {}
+
+    def clear(self):
+        with self.lock:
+            self._reset()
+
+    # Tasks
+
+    def add_task(self, task: dict):
+        with self.lock:
+            self._tasks[task["id"]] = copy.deepcopy(task)
+            self._tasks_by_uid.setdefault(task.get("uid"), set()).add(task["id"])
+
+    def get_task(self, task_id: str) -> dict | None:
+        with self.lock:
+            task = self._tasks.get(task_id)
+            return copy.deepcopy(task) if task else None
+
+    def list_tasks(self, uid: str, include_deleted: bool = False) -> list:
+        with self.lock:
+            tasks = [self._tasks[i] for i in self._tasks_by_uid.get(uid, ())]
+            tasks = [copy.deepcopy(t) for t in tasks if include_deleted or not t.get("is_deleted")]
+        return sorted(tasks, key=lambda t: t.get("created_at") or "")
+
+    def update_task(self, task_id: str, uid: str, updates: dict) -> bool:
+        """Applies updates to the user's task; False if it doesn't exist or belongs to someone else."""
+        with self.lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.get("uid") != uid:
+                return False
+            task.update(copy.deepcopy(updates))
+            return True
+
+    def task_uids(self) -> list:
+        with self.lock:
+            return [uid for uid, ids in self._tasks_by_uid.items() if uid and ids]
+
+    # Events
+
+    def upsert_events(self, events: list):
+        with self.lock:
+            for event in events:
+                self._remove_event(event["id"])
+                self._events[event["id"]] = copy.deepcopy(event)
+                insort(self._event_dates, (str(event.get("date") or ""), event["id"]))
+
+    def _remove_event(self, event_id: str) -> dict | None:
+        event = self._events.pop(event_id, None)
+        if event is not None:
+            key = (str(event.get("date") or ""), event_id)
+            del self._event_dates[bisect_left(self._event_dates, key)]
+        return event
+
+    def delete_event(self, event_id: str) -> dict | None:
+        """Removes and returns the event, or None if there is no such event."""
+        with self.lock:
+            return self._remove_event(event_id)
+
+    def list_events(self, start: str | None = None, end: str | None = None) -> list:
+        """Events with start <= date <= end (either bound optional), ordered by date then id."""
+        with self.lock:
+            lo = bisect_left(self._event_dates, (start, "")) if start else 0
+            # "\uffff" sorts after any id, so every event dated `end` is included
+            hi = bisect_right(self._event_dates, (end, "\uffff")) if end else len(self._event_dates)
+            return [copy.deepcopy(self._events[i]) for _, i in self._event_dates[lo:hi]]
+
+    # Memos
+
+    def get_memos(self, uid: str) -> tuple[list, int]:
+        """Returns (items, version)."""
+        with self.lock:
+            return copy.deepcopy(self._memos.get(uid, [])), self._memo_versions.get(uid, 0)
+
+    def update_memos(self, uid: str, apply) -> tuple[list, int]:
+        """
+        Atomically replaces the user's memos with apply(items, version), which may
+        raise to abort, and bumps the version. Returns (new items, new version).
+        """
+        with self.lock:
+            items, version = self.get_memos(uid)
+            new_items = apply(items, version)
+            self._memos[uid] = copy.deepcopy(new_items)
+            self._memo_versions[uid] = version + 1
+            return new_items, version + 1
+
+    def memo_uids(self) -> list:
+        with self.lock:
+            return list(self._memos)
+
+    # Schedule imports
+
+    def get_import(self, filename: str) -> dict | None:
+        with self.lock:
+            return copy.deepcopy(self._imports.get(filename))
+
+    def has_import_hash(self, file_hash: str) -> bool:
+        with self.lock:
+            return any(r.get("file_hash") == file_hash for r in self._imports.values())
+
+    def save_import(self, filename: str, record: dict):
+        with self.lock:
+            self._imports[filename] = copy.deepcopy(record)
+
+
+demo_store = DemoStore()
@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import re
+import time
+from datetime import date, datetime
+
+from backend.services.gemini import gemini_service
+from backend.services.task_parser import parse_task
+from backend.services.prompt_builder import MAX_LINE_TOKENS, chunk_by_budget, clip, compact, estimate_tokens, record
+
+# The analyze prompts embed today's date, so identical inputs only hit the cache within the same day
+ANALYZE_CACHE_TTL = 12 * 3600
+# Lines per Gemini call in a batch, and how many of those calls run at once
+BATCH_CHUNK_LINES = int(os.getenv("ANALYZE_BATCH_CHUNK_LINES", 25))
+BATCH_WORKERS = int(os.getenv("ANALYZE_BATCH_WORKERS", 4))
+MAX_BATCH_LINES = int(os.getenv("ANALYZE_MAX_BATCH_LINES", 200))
+# Resolve simple inputs locally; Gemini only sees lines the parser isn't sure about
+LOCAL_PARSER = os.getenv("TASK_LOCAL_PARSER", "1") != "0"
+LOCAL_MIN_CONFIDENCE = float(os.getenv("TASK_LOCAL_MIN_CONFIDENCE", 0.8))
+# Estimated prompt tokens: user input is clipped to fit; batch chunks close early when full
+ANALYZE_PROMPT_TOKENS = int(os.getenv("ANALYZE_PROMPT_TOKENS", 800))
+BATCH_PROMPT_TOKENS = int(os.getenv("ANALYZE_BATCH_PROMPT_TOKENS", 3000))
+
+PRIORITIES = {"high": "High", "medium": "Medium", "low": "Low"}
+
+# List markers people paste along with their items: "-", "*", "•", "1.", "2)", "□", ...
+_BULLET = re.compile(r"^\s*(?:[-*•·▪□☐■○●]|\d{1,3}[.)])\s*")
+
+
+def split_lines(text: str) -> list:
+    """Splits pasted notes into items, dropping list markers and blank lines."""
+    items = []
+    for line in text.splitlines():
+        item = _BULLET.sub("", line).strip()
+        if item:
+            items.append(item)
+    return items
+
+
+def normalize_result(data: dict, fallback_task: str) -> dict:
+    """Coerces one model result into {task, due_date, priority}."""
+    due_date = data.get("due_date")
+    try:
+        due_date = date.fromisoformat(str(due_date)[:10]).isoformat() if due_date else None
+    except ValueError:
+        due_date = None
+    return {
+        "task": str(data.get("task") or fallback_task).strip(),
+        "due_date": due_date,
+        "priority": PRIORITIES.get(str(data.get("priority") or "").lower(), "Medium"),
+    }
+
+
+class TaskAnalyzer:
+    def today(self) -> str:
+        now = datetime.now()
+        return f"{now.strftime('%Y-%m-%d')} ({now.strftime('%A')})"
+
+    def build_prompt(self, text: str) -> str:
+        instructions = self._prompt(" ")
+        text = clip(compact(text), ANALYZE_PROMPT_TOKENS - estimate_tokens(instructions))
+        return record("analyze", self._prompt(text))
+
+    def _prompt(self, text: str) -> str:
+        return compact(f"""
+    You are a helpful assistant. Extract the following details from the user's input:
+    - task: The main task description.
+    - due_date: The due date in ISO 8601 format (YYYY-MM-DD) if mentioned. If "next Tuesday", calculate it based on today ({self.today()}). If not mentioned, return null.
+    - priority: High, Medium, or Low. Infer from context (e.g., "urgent", "important" = High). Default to Medium.
+
+    Return ONLY a valid JSON object.
+
+    User Input: "{text}"
+    """)
+
+    def build_batch_prompt(self, lines: list) -> str:
+        numbered = "\n".join(f"{i}. {clip(compact(line), MAX_LINE_TOKENS)}" for i, line in enumerate(lines, start=1))
+        return record("analyze_batch", compact(f"""
+    You are a helpful assistant. Each numbered line below is a separate to-do item.
+    For every line, extract:
+    - task: The main task description.
+    - due_date: The due date in ISO 8601 format (YYYY-MM-DD) if mentioned. Resolve relative dates like "next Tuesday" or "내일" based on today ({self.today()}). If not mentioned, return null.
+    - priority: High, Medium, or Low. Infer from context (e.g., "urgent", "important", "긴급" = High). Default to Medium.
+
+    Return ONLY a valid JSON array with exactly one object per line, in the same order:
+    [{{"index": <line number>, "task": "...", "due_date": "YYYY-MM-DD" or null, "priority": "High" | "Medium" | "Low"}}]
+
+    Lines:
+{numbered}
+    """))
+
+    def parse_json(self, response_text: str):
+        if response_text.startswith("Error:"):
+            raise Exception(response_text)
+        clean_text = response_text.replace("```json", "").replace("```", "").strip()
+        return json.loads(clean_text)
+
+    def parse_locally(self, text: str) -> dict | None:
+        """{task, due_date, priority, source: "local", confidence} if the local parser is confident enough."""
+        if not LOCAL_PARSER:
+            return None
+        result = parse_task(text)
+        if result["confidence"] < LOCAL_MIN_CONFIDENCE:
+            return None
+        return {**result, "source": "local"}
+
+    async def analyze(self, text: str) -> dict:
+        """
+        One input: the local parser's result, or else one Gemini call.
+        Returns {task, due_date, priority, source: "local" | "llm"}.
+        """
+        local = self.parse_locally(text)
+        if local:
+            return local
+        response_text = await gemini_service.generate_content(self.build_prompt(text), cache_ttl=ANALYZE_CACHE_TTL)
+        try:
+            data = self.parse_json(response_text)
+        except Exception as e:
+            print(f"Failed to parse Gemini response: {response_text}")
+            raise Exception(f"{e}. Raw: {response_text[:100]}")
+        if not isinstance(data, dict):
+            raise Exception(f"Unexpected AI response shape: {type(data).__name__}")
+        return {**normalize_result(data, text), "source": "llm"}
+
+    async def analyze_chunk(self, lines: list) -> dict:
+        """Analyzes up to BATCH_CHUNK_LINES lines in one call. Returns {line position: result}."""
+        response_text = await gemini_service.generate_content(self.build_batch_prompt(lines), cache_ttl=ANALYZE_CACHE_TTL)
+        data = self.parse_json(response_text)
+        if not isinstance(data, list):
+            raise Exception(f"Unexpected AI response shape: {type(data).__name__}")
+
+        mapped = {}
+        for position, item in enumerate(data):
+            if not isinstance(item, dict):
+                continue
+            # Prefer the echoed line number; fall back to array order
+            try:
+                index = int(item.get("index")) - 1
+            except (TypeError, ValueError):
+                index = position
+            if 0 <= index < len(lines) and index not in mapped:
+                mapped[index] = {**normalize_result(item, lines[index]), "source": "llm"}
+        return mapped
+
+    async def analyze_batch(self, lines: list, workers: int = BATCH_WORKERS) -> tuple[list, dict]:
+        """
+        Analyzes many lines: locally where the parser is confident, the rest with
+        one Gemini call per BATCH_CHUNK_LINES lines, at most `workers` calls in
+        flight. Returns (one result per line, in input order, each with "index",
+        "input" and "source"; report).
+        """
+        started = time.perf_counter()
+        results = [{"index": i, "input": line} for i, line in enumerate(lines)]
+        pending = []
+        for i, line in enumerate(lines):
+            local = self.parse_locally(line)
+            if local:
+                results[i].update(local)
+            else:
+                pending.append(i)
+        chunks = chunk_by_budget(pending, lambda i: min(estimate_tokens(lines[i]), MAX_LINE_TOKENS) + 2,
+                                 BATCH_PROMPT_TOKENS, BATCH_CHUNK_LINES)
+        sem = asyncio.Semaphore(max(1, workers))
+
+        async def run(positions: list):
+            async with sem:
+                try:
+                    mapped = await self.analyze_chunk([lines[i] for i in positions])
+                except Exception as e:
+                    for i in positions:
+                        results[i]["error"] = str(e)[:300]
+                    return
+                for local, i in enumerate(positions):
+                    if local in mapped:
+                        results[i].update(mapped[local])
+                    else:
+                        results[i]["error"] = "missing from AI response"
+
+        await asyncio.gather(*(run(c) for c in chunks))
+        report = {
+            "lines": len(lines),
+            "local": len(lines) - len(pending),
+            "llm_lines": len(pending),
+            "chunks": len(chunks),
+            "failed": sum(1 for r in results if "error" in r),
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        return results, report
+
+
+task_analyzer = TaskAnalyzer()
@@ -0,0 +1,213 @@
+import calendar
+import re
+from datetime import date, timedelta
+
+# Korean and English urgency keywords; matched case-insensitively and removed from the task text
+HIGH_KEYWORDS = ["긴급", "급함", "급한", "급히", "시급", "중요", "빨리", "asap", "urgent", "urgently", "important", "critical", "high priority"]
+LOW_KEYWORDS = ["천천히", "여유", "나중에", "언젠가", "시간 날 때", "low priority", "someday", "when possible", "no rush"]
+
+_KO_WEEKDAYS = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4, "토": 5, "일": 6}
+_EN_WEEKDAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+_EN_MONTHS = {m: i for i, m in enumerate(["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_EN_MONTH = (r"(jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+             r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)")
+_EN_NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+
+# Korean date words and keywords must be whole words: "교내일정", "오늘의",
+# "화요일반" and "중요도" are not dates or priorities. A date may take a
+# deadline particle ("내일까지", "오늘 중", "월요일에"), which must end the word,
+# so "오늘 중요" keeps its "중요".
+_KO_START = r"(?<![가-힣])"
+_KO_SUFFIX = r"(?:\s*(?:까지는|까지|안에|내로|이내|중에|중|에|은|는|도))?(?![가-힣])"
+# Adjective endings a keyword may take: "중요한", "시급히"
+_KO_KEYWORD_END = r"(?:하게|한|히|함|해)?(?![가-힣])"
+_EN_DEADLINE = r"\b(?:by|on|due|until|before)\s+"
+_EN_PREFIX = r"(?:" + _EN_DEADLINE + r")?"
+_EN_WEEKDAY = r"(mon|tue|wed|thu|fri|sat|sun)(?:day|sday|nesday|rsday|urday|s|r|rs)?\.?(?![a-z])"
+# Bare weekdays only in full, so "month" or "sun cream" aren't read as dates
+_EN_WEEKDAY_FULL = r"(mon|tue|wed|thu|fri|sat|sun)(?:day|sday|nesday|rsday|urday)\b"
+
+# Words that suggest a deadline the patterns below did not resolve
+_DATE_HINT = re.compile(
+    r"\d+\s*[월일주]|\d{1,2}/\d{1,2}|(?<![\d.])\d{1,2}\.\d{1,2}(?![\d.]|\s*[배%])|[월화수목금토일]요일"
+    r"|까지|이내|내로|전에|전까지|말\b|초순|중순|하순|이번\s*주|다음\s*주|금주|차주"
+    # Date words inside a longer word ("교내일정") or with an unknown ending
+    r"|오늘|금일|내일|명일|모레|글피"
+    r"|\b(by|due|until|before|deadline|week|month|tomorrow|today|next|this)\b",
+    re.IGNORECASE,
+)
+
+
+# Whole month names or abbreviations only: "Jane", "marketing", "Augustine" are not months
+_EN_MONTH_DAY = re.compile(
+    r"(" + _EN_DEADLINE + r")?\b" + _EN_MONTH + r"\b(\.)?\s+(\d{1,2})(st|nd|rd|th)?\b", re.IGNORECASE,
+)
+_EN_FULL_MONTHS = {"january", "february", "april", "july", "september", "october", "november", "december"}
+# Confidence for a date that may just be words ("may 3", "Mar 5 slides"); low enough to ask Gemini
+AMBIGUOUS_DATE_CONFIDENCE = 0.5
+
+
+def _ambiguous_month_day(m: re.Match) -> bool:
+    """
+    A bare "<month> N" is trusted with deadline wording ("by Mar 5"), an
+    ordinal ("Mar 5th"), an abbreviation dot ("Mar. 5"), or a full month name
+    that isn't also a common word or name (may, march, june, august).
+    """
+    if m.group(1) or m.group(3) or m.group(5):
+        return False
+    return m.group(2).lower() not in _EN_FULL_MONTHS
+
+
+def _monday(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _week_day(today: date, weeks: int, weekday: int) -> date:
+    return _monday(today) + timedelta(days=7 * weeks + weekday)
+
+
+def _upcoming(today: date, weekday: int) -> date:
+    """The next `weekday` on or after today."""
+    return today + timedelta(days=(weekday - today.weekday()) % 7)
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _month_day(today: date, month: int, day: int, year: int | None = None) -> date:
+    """Month/day without a year is the nearest one that isn't long past (school years cross New Year)."""
+    result = date(year or today.year, month, day)
+    if year is None and (today - result).days > 180:
+        result = date(today.year + 1, month, day)
+    return result
+
+
+def _ko_weeks(word: str) -> int:
+    word = re.sub(r"\s+", "", word)
+    return {"이번주": 0, "금주": 0, "다음주": 1, "차주": 1, "다다음주": 2}[word]
+
+
+# (pattern, resolver(match, today) -> date). Checked in order, more specific first.
+DATE_PATTERNS = [
+    (re.compile(r"(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*일?" + _KO_SUFFIX),
+     lambda m, t: date(int(m.group(1)), int(m.group(2)), int(m.group(3)))),
+    (re.compile(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일" + _KO_SUFFIX),
+     lambda m, t: _month_day(t, int(m.group(1)), int(m.group(2)))),
+    (re.compile(_KO_START + r"(이번\s*주|금주|다다음\s*주|다음\s*주|차주)\s*([월화수목금토일])요일" + _KO_SUFFIX),
+     lambda m, t: _week_day(t, _ko_weeks(m.group(1)), _KO_WEEKDAYS[m.group(2)])),
+    (re.compile(_KO_START + r"(이번\s*주|금주|다다음\s*주|다음\s*주|차주)\s*말" + _KO_SUFFIX),
+     lambda m, t: _week_day(t, _ko_weeks(m.group(1)), 5)),
+    # "이번 주까지" = that week's Friday (school week)
+    (re.compile(_KO_START + r"(이번\s*주|금주|다다음\s*주|다음\s*주|차주)" + r"(?:\s*(?:까지는|까지|안에|내로|중에|중)(?![가-힣]))"),
+     lambda m, t: _week_day(t, _ko_weeks(m.group(1)), 4)),
+    (re.compile(_KO_START + r"(이번\s*달|이달|다음\s*달)\s*말" + _KO_SUFFIX + r"|" + _KO_START + r"(월말)" + _KO_SUFFIX),
+     lambda m, t: _month_end(t.year + (t.month == 12), t.month % 12 + 1) if m.group(1) and "다음" in m.group(1) else _month_end(t.year, t.month)),
+    (re.compile(r"(\d{1,3})\s*일\s*(?:후|뒤)(?:에)?" + _KO_SUFFIX),
+     lambda m, t: t + timedelta(days=int(m.group(1)))),
+    (re.compile(r"(\d{1,2}|일)\s*주일?\s*(?:후|뒤)(?:에)?" + _KO_SUFFIX),
+     lambda m, t: t + timedelta(weeks=1 if m.group(1) == "일" else int(m.group(1)))),
+    (re.compile(_KO_START + r"([월화수목금토일])요일" + _KO_SUFFIX),
+     lambda m, t: _upcoming(t, _KO_WEEKDAYS[m.group(1)])),
+    (re.compile(_KO_START + r"(오늘|금일)" + _KO_SUFFIX), lambda m, t: t),
+    (re.compile(_KO_START + r"(내일|명일)" + _KO_SUFFIX), lambda m, t: t + timedelta(days=1)),
+    (re.compile(_KO_START + r"모레" + _KO_SUFFIX), lambda m, t: t + timedelta(days=2)),
+    (re.compile(_KO_START + r"글피" + _KO_SUFFIX), lambda m, t: t + timedelta(days=3)),
+
+    (_EN_MONTH_DAY,
+     lambda m, t: _month_day(t, _EN_MONTHS[m.group(2).lower()[:3]], int(m.group(4)))),
+    (re.compile(_EN_PREFIX + r"\b(?:the\s+)?day\s+after\s+tomorrow\b", re.IGNORECASE),
+     lambda m, t: t + timedelta(days=2)),
+    (re.compile(_EN_PREFIX + r"\b(next|this)\s+" + _EN_WEEKDAY, re.IGNORECASE),
+     lambda m, t: _week_day(t, 1 if m.group(1).lower() == "next" else 0, _EN_WEEKDAYS[m.group(2).lower()])),
+    (re.compile(_EN_PREFIX + r"\b(?:the\s+)?end\s+of\s+(?:the\s+)?(next\s+)?month\b", re.IGNORECASE),
+     lambda m, t: _month_end(t.year + (t.month == 12), t.month % 12 + 1) if m.group(1) else _month_end(t.year, t.month)),
+    (re.compile(_EN_PREFIX + r"\b(?:the\s+)?end\s+of\s+(?:the\s+|this\s+)?week\b", re.IGNORECASE),
+     lambda m, t: _week_day(t, 0, 4)),
+    (re.compile(_EN_PREFIX + r"\bnext\s+week\b", re.IGNORECASE),
+     lambda m, t: _week_day(t, 1, 4)),
+    (re.compile(r"\bin\s+(\d{1,3}|an?|one|two|three|four|five|six|seven)\s+(day|week)s?\b", re.IGNORECASE),
+     lambda m, t: t + timedelta(days=(_EN_NUMBERS.get(m.group(1).lower()) or int(m.group(1))) * (7 if m.group(2).lower() == "week" else 1))),
+    (re.compile(_EN_PREFIX + r"\b" + _EN_WEEKDAY_FULL, re.IGNORECASE),
+     lambda m, t: _upcoming(t, _EN_WEEKDAYS[m.group(1).lower()])),
+    (re.compile(_EN_PREFIX + r"\b(today|tonight)\b", re.IGNORECASE), lambda m, t: t),
+    (re.compile(_EN_PREFIX + r"\btomorrow\b", re.IGNORECASE), lambda m, t: t + timedelta(days=1)),
+    # N/M alone is as often a fraction ("1/2 page") as a date: only with a year
+    # or deadline wording around it
+    (re.compile(_EN_PREFIX + r"(?<![\d.])(\d{1,2})/(\d{1,2})/(\d{4}|\d{2})(?![\d/])"),
+     lambda m, t: date(int(m.group(3)) + (2000 if len(m.group(3)) == 2 else 0), int(m.group(1)), int(m.group(2)))),
+    (re.compile(r"(?:" + _EN_DEADLINE + r")(?<![\d.])(\d{1,2})/(\d{1,2})(?![\d/])", re.IGNORECASE),
+     lambda m, t: _month_day(t, int(m.group(1)), int(m.group(2)))),
+    (re.compile(r"(?<![\d.])(\d{1,2})/(\d{1,2})(?![\d/])\s*(?:까지는|까지|안에|내로|이내)"),
+     lambda m, t: _month_day(t, int(m.group(1)), int(m.group(2)))),
+]
+
+
+def _keyword_pattern(keywords: list) -> re.Pattern:
+    alternatives = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    # Optional surrounding brackets and exclamation marks go with the keyword: "(급함)", "[urgent]!"
+    return re.compile(r"[\(\[]?\s*" + _KO_START + r"(?:" + alternatives + r")" + _KO_KEYWORD_END + r"\s*[\)\]]?!*", re.IGNORECASE)
+
+
+_HIGH = _keyword_pattern(HIGH_KEYWORDS)
+_LOW = _keyword_pattern(LOW_KEYWORDS)
+# A keyword left inside a longer word ("중요도") may still mean something; Gemini decides
+_KEYWORD_HINT = re.compile("|".join(re.escape(k) for k in HIGH_KEYWORDS + LOW_KEYWORDS), re.IGNORECASE)
+
+
+def _clean(text: str) -> str:
+    text = re.sub(r"[\(\[]\s*[\)\]]", " ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ,.:;-~!")
+
+
+def parse_task(text: str, today: date | None = None) -> dict:
+    """
+    Parses a to-do line locally into {task, due_date, priority, confidence}.
+
+    Resolves common relative and absolute dates ("내일", "모레", "다음주 화요일",
+    "3월 4일", "next Tuesday", "in 3 days", "3/4") and urgency keywords. Weeks
+    start on Monday; "next <weekday>" / "다음주 <요일>" is that day of next week,
+    and a bare week deadline ("이번 주까지", "next week") is its Friday.
+    Confidence drops when something that looks like a deadline is left
+    unresolved, or when keywords conflict; callers ask Gemini in that case.
+    """
+    today = today or date.today()
+    rest = text
+    confidence = 1.0
+
+    due_date = None
+    for pattern, resolve in DATE_PATTERNS:
+        m = pattern.search(rest)
+        if not m:
+            continue
+        try:
+            due_date = resolve(m, today).isoformat()
+        except ValueError:
+            # e.g. "2월 30일"
+            confidence = 0.0
+            break
+        if pattern is _EN_MONTH_DAY and _ambiguous_month_day(m):
+            confidence = AMBIGUOUS_DATE_CONFIDENCE
+        rest = rest[:m.start()] + " " + rest[m.end():]
+        break
+
+    high = _HIGH.search(rest)
+    rest = _HIGH.sub(" ", rest)
+    low = _LOW.search(rest)
+    rest = _LOW.sub(" ", rest)
+    priority = "High" if high else "Low" if low else "Medium"
+    if high and low:
+        confidence = min(confidence, 0.4)
+    if _KEYWORD_HINT.search(rest):
+        confidence = min(confidence, 0.3)
+
+    # A second date, or deadline wording we couldn't resolve
+    if _DATE_HINT.search(rest) or any(p.search(rest) for p, _ in DATE_PATTERNS):
+        confidence = min(confidence, 0.3)
+
+    task = _clean(rest)
+    if not task:
+        confidence = 0.0
+    return {"task": task, "due_date": due_date, "priority": priority, "confidence": confidence}
+
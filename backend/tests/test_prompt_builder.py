@@ -0,0 +1,19 @@
+from backend.services import metrics
+from backend.services.prompt_builder import PromptBuilder
+
+
+def test_sections_filled_by_priority_and_labelled_by_key():
+    builder = PromptBuilder("test_builder", max_tokens=60)
+    builder.text("Header text")
+    builder.section("dated", "[Schedule (2026-01-15)]", [f"line {i}" for i in range(30)], priority=1)
+    builder.section("first", "[First]", ["b"], priority=0)
+    builder.section("empty", "[Empty]", [], priority=2)
+    prompt = builder.build()
+
+    assert prompt.startswith("Header text\n\n[Schedule (2026-01-15)]\nline 0\n")
+    assert "(+19 more omitted)" in prompt
+    assert prompt.endswith("[First]\nb\n\n[Empty]\nNone")
+    # The label is the stable key, not the title with today's date in it
+    truncated = metrics.prompt_truncated_lines.render()
+    assert 'prompt_truncated_lines_total{endpoint="test_builder",section="dated"} 19' in truncated
+    assert "2026-01-15" not in "".join(truncated)
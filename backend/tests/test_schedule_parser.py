@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from backend.services.schedule_parser import parse_sheet
+
+
+def test_time_from_date_cell_without_time_column():
+    sheet = {"sheet": "S", "header": ["일시", "행사"], "rows": [
+        [datetime(2026, 3, 5, 9, 30), "datetime cell"],
+        ["2026.3.5 09:30", "dotted date"],
+        ["3월 6일(금) 10:00", "weekday"],
+        ["3월 7일", "date only"],
+        [datetime(2026, 3, 8), "midnight"],
+        ["2026.3.9 오후 2시", "unparsed time"],
+    ]}
+    events, leftover = parse_sheet(sheet, default_year=2026)
+    assert [(e["title"], e["date"], e["time"]) for e in events] == [
+        ("datetime cell", "2026-03-05", "09:30"),
+        ("dotted date", "2026-03-05", "09:30"),
+        ("weekday", "2026-03-06", "10:00"),
+        ("date only", "2026-03-07", "All Day"),
+        ("midnight", "2026-03-08", "All Day"),
+    ]
+    # A time that can't be read goes to Gemini instead of becoming "All Day"
+    assert leftover["rows"] == [["2026.3.9 오후 2시", "unparsed time"]]
+
+
+def test_time_column_wins_over_date_cell():
+    sheet = {"sheet": "S", "header": ["일시", "시간", "행사"], "rows": [
+        ["2026.3.5 09:30", "14:00~16:00", "meeting"],
+        ["2026.3.6 11:00", None, "assembly"],
+    ]}
+    events, _ = parse_sheet(sheet, default_year=2026)
+    assert [e["time"] for e in events] == ["14:00~16:00", "11:00"]
@@ -0,0 +1,53 @@
+from datetime import date
+
+import pytest
+
+from backend.services.task_analyzer import LOCAL_MIN_CONFIDENCE
+from backend.services.task_parser import parse_task
+
+TODAY = date(2026, 1, 15)  # a Thursday
+
+# Parsed locally: (text, task, due_date, priority)
+LOCAL_CASES = [
+    ("Call Jane 3 times", "Call Jane 3 times", None, "Medium"),
+    ("Prepare marketing 5 slides", "Prepare marketing 5 slides", None, "Medium"),
+    ("Decide 2 options", "Decide 2 options", None, "Medium"),
+    ("Meet Augustine 4 pm", "Meet Augustine 4 pm", None, "Medium"),
+    ("Report due March 5th", "Report", "2026-03-05", "Medium"),
+    ("Submit form by 3/4", "Submit form", "2026-03-04", "Medium"),
+    ("Pay rent 4/1/2026", "Pay rent", "2026-04-01", "Medium"),
+    ("Meeting next Tuesday urgent", "Meeting", "2026-01-20", "High"),
+    ("3/4까지 보고서 제출", "보고서 제출", "2026-03-04", "Medium"),
+    ("오늘 중요 회의", "회의", "2026-01-15", "High"),
+    ("오늘 중 회의록 정리", "회의록 정리", "2026-01-15", "Medium"),
+    ("금요일에 보고서 제출", "보고서 제출", "2026-01-16", "Medium"),
+    ("내일은 보고서 제출", "보고서 제출", "2026-01-16", "Medium"),
+    ("중요한 회의 내일까지", "회의", "2026-01-16", "High"),
+    ("다음주 월요일에 회의", "회의", "2026-01-19", "Medium"),
+]
+
+# Left for Gemini: (text, task, due_date, priority) with low confidence.
+# Words that only contain a date word or keyword keep their text.
+GEMINI_CASES = [
+    ("Write 1/2 page summary", "Write 1/2 page summary", None, "Medium"),
+    ("Dentist May 3", "Dentist", "2026-05-03", "Medium"),
+    ("이번 주 중요 정리", "이번 주 정리", None, "High"),
+    ("교내일정 정리", "교내일정 정리", None, "Medium"),
+    ("오늘의 날씨 공지", "오늘의 날씨 공지", None, "Medium"),
+    ("화요일반 수업", "화요일반 수업", None, "Medium"),
+    ("중요도 높은 업무", "중요도 높은 업무", None, "Medium"),
+]
+
+
+@pytest.mark.parametrize("text, task, due_date, priority", LOCAL_CASES)
+def test_parsed_locally(text, task, due_date, priority):
+    result = parse_task(text, today=TODAY)
+    assert (result["task"], result["due_date"], result["priority"]) == (task, due_date, priority)
+    assert result["confidence"] >= LOCAL_MIN_CONFIDENCE
+
+
+@pytest.mark.parametrize("text, task, due_date, priority", GEMINI_CASES)
+def test_left_for_gemini(text, task, due_date, priority):
+    result = parse_task(text, today=TODAY)
+    assert (result["task"], result["due_date"], result["priority"]) == (task, due_date, priority)
+    assert result["confidence"] < LOCAL_MIN_CONFIDENCE
@@ -1,6 +1,6 @@
 "use client";
 
-import { useState, useEffect, KeyboardEvent } from "react";
+import { useState, useEffect, useRef, KeyboardEvent } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -13,38 +13,73 @@ interface MemoItem {
     checked: boolean;
 }
 
+interface MemoOp {
+    op: "add" | "update" | "check" | "delete";
+    id: string;
+    text?: string;
+    checked?: boolean;
+}
+
 export function MemoPad() {
     const [items, setItems] = useState<MemoItem[]>([]);
     const [newItemText, setNewItemText] = useState("");
     const [isSaved, setIsSaved] = useState(false);
 
-    useEffect(() => {
+    // Server version the local list is based on; sent with every change
+    const versionRef = useRef(0);
+    // Saves run one at a time so each is based on the previous one's version
+    const queueRef = useRef<Promise<void>>(Promise.resolve());
+
+    const loadItems = () => {
         // Fetch memos from backend
         fetch('/api/memos/?uid=default_user')
-            .then(res => res.json())
+            .then(res => {
+                versionRef.current = Number(res.headers.get('X-Memos-Version') ?? 0);
+                return res.json();
+            })
             .then(data => {
                 if (Array.isArray(data)) {
                     setItems(data);
                 }
             })
             .catch(err => console.error("Failed to fetch memos", err));
+    };
+
+    useEffect(() => {
+        loadItems();
     }, []);
 
-    const saveItems = (newItems: MemoItem[]) => {
-        setItems(newItems);
-        // Save to backend
-        fetch('/api/memos/?uid=default_user', {
-            method: 'POST',
+    const sync = (method: 'POST' | 'PATCH', body: object) => {
+        queueRef.current = queueRef.current.then(() => fetch('/api/memos/?uid=default_user', {
+            method,
             headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ items: newItems })
+            body: JSON.stringify({ ...body, base_version: versionRef.current })
         })
-            .then(res => {
+            .then(async res => {
                 if (res.ok) {
+                    const data = await res.json();
+                    versionRef.current = data.version;
                     setIsSaved(true);
                     setTimeout(() => setIsSaved(false), 2000);
+                } else if (res.status === 409) {
+                    // Changed in another tab/device: take the server's list
+                    const { detail } = await res.json();
+                    versionRef.current = detail.version;
+                    setItems(detail.items);
                 }
             })
-            .catch(err => console.error("Failed to save memos", err));
+            .catch(err => console.error("Failed to save memos", err)));
+    };
+
+    // Sends only the changed items
+    const saveOps = (newItems: MemoItem[], ops: MemoOp[]) => {
+        setItems(newItems);
+        sync('PATCH', { ops });
+    };
+
+    const saveItems = (newItems: MemoItem[]) => {
+        setItems(newItems);
+        sync('POST', { items: newItems });
     };
 
     const handleAddItem = () => {
@@ -54,7 +89,7 @@ export function MemoPad() {
             text: newItemText.trim(),
             checked: false,
         };
-        saveItems([...items, newItem]);
+        saveOps([...items, newItem], [{ op: "add", ...newItem }]);
         setNewItemText("");
     };
 
@@ -68,12 +103,12 @@ export function MemoPad() {
         const newItems = items.map(item =>
             item.id === id ? { ...item, checked } : item
         );
-        saveItems(newItems);
+        saveOps(newItems, [{ op: "check", id, checked }]);
     };
 
     const deleteItem = (id: string) => {
         const newItems = items.filter(item => item.id !== id);
-        saveItems(newItems);
+        saveOps(newItems, [{ op: "delete", id }]);
     };
 
     const handleClear = () => {
@@ -2,7 +2,7 @@
 
 import { useEffect, useState } from "react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
-import { getBriefing } from "@/lib/api";
+import { getBriefing, streamBriefing } from "@/lib/api";
 import { Sparkles, Loader2, RefreshCcw } from "lucide-react";
 import { Button } from "@/components/ui/button";
 
@@ -13,8 +13,22 @@ export function MorningBriefing() {
     const fetchBriefing = async (force: boolean = false) => {
         setLoading(true);
         try {
-            const data = await getBriefing(force);
-            setBriefing(data.briefing);
+            // Stream tokens as they arrive; fall back to the blocking endpoint if streaming fails
+            let started = false;
+            try {
+                await streamBriefing((text) => {
+                    if (!started) {
+                        started = true;
+                        setBriefing(text);
+                    } else {
+                        setBriefing((prev) => (prev ?? "") + text);
+                    }
+                }, force);
+            } catch (streamError) {
+                if (started) throw streamError;
+                const data = await getBriefing(force);
+                setBriefing(data.briefing);
+            }
         } catch (error) {
             console.error("Failed to fetch briefing:", error);
             setBriefing("Failed to load briefing. Please try again later.");
@@ -6,7 +6,7 @@ import { Button } from "@/components/ui/button";
 import { Checkbox } from "@/components/ui/checkbox";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { Trash2, Plus, Calendar, AlertCircle, Loader2 } from "lucide-react";
-import { analyzeTask, createTask, getTasks, updateTask } from "@/lib/api";
+import { analyzeTask, analyzeTasks, bulkTasks, createTask, getTasks, updateTask } from "@/lib/api";
 import { cn } from "@/lib/utils";
 
 interface Task {
@@ -60,6 +60,31 @@ export function TodoList() {
         }
     };
 
+    // Pasting several lines adds each one as a task, analyzed in one batch request
+    const handlePaste = async (e: React.ClipboardEvent<HTMLInputElement>) => {
+        const lines = e.clipboardData.getData("text").split(/\r?\n/).map(l => l.trim()).filter(Boolean);
+        if (lines.length < 2) return;
+        e.preventDefault();
+        setIsAnalyzing(true);
+        try {
+            const { results } = await analyzeTasks(lines);
+            const operations = results.map((r: any) => ({
+                op: "create" as const,
+                task: r.task ?? r.input,
+                due_date: r.due_date ?? null,
+                priority: r.priority ?? "Medium",
+            }));
+            const { results: created } = await bulkTasks(operations);
+            const newTasks = created.filter((r: any) => r.status === "success").map((r: any) => r.task);
+            setTasks(prev => [...newTasks.reverse(), ...prev]);
+        } catch (error) {
+            console.error("Error adding tasks:", error);
+            alert("Failed to add tasks. Please try again.");
+        } finally {
+            setIsAnalyzing(false);
+        }
+    };
+
     const handleKeyDown = (e: React.KeyboardEvent) => {
         if (e.key === "Enter") {
             handleAdd();
@@ -115,6 +140,7 @@ export function TodoList() {
                     value={inputValue}
                     onChange={(e) => setInputValue(e.target.value)}
                     onKeyDown={handleKeyDown}
+                    onPaste={handlePaste}
                     disabled={isanalyzing}
                     className="bg-white"
                 />
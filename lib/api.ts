@@ -13,6 +13,17 @@ export async function analyzeTask(text: string) {
     return res.json();
 }
 
+// Many to-do lines (e.g. pasted meeting notes) in one request; one result per line, in order
+export async function analyzeTasks(texts: string[]) {
+    const res = await fetch(`${API_URL}/tasks/analyze/batch`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ texts }),
+    });
+    if (!res.ok) throw new Error("Failed to analyze tasks");
+    return res.json();
+}
+
 export async function createTask(taskData: any) {
     const res = await fetch(`${API_URL}/tasks`, {
         method: "POST",
@@ -39,6 +50,21 @@ export async function updateTask(taskId: string, updates: any) {
     return res.json();
 }
 
+export type BulkTaskOperation =
+    | { op: "create"; task: string; due_date?: string | null; priority?: string }
+    | { op: "update"; id: string; updates: Record<string, any> }
+    | { op: "delete"; id: string };
+
+export async function bulkTasks(operations: BulkTaskOperation[]) {
+    const res = await fetch(`${API_URL}/tasks/bulk`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ operations }),
+    });
+    if (!res.ok) throw new Error("Failed to apply task changes");
+    return res.json();
+}
+
 export async function getBriefing(forceRefresh: boolean = false) {
     const url = forceRefresh ? `${API_URL}/briefing?force_refresh=true` : `${API_URL}/briefing`;
     const res = await fetch(url);
@@ -46,6 +72,39 @@ export async function getBriefing(forceRefresh: boolean = false) {
     return res.json();
 }
 
+export async function streamBriefing(onChunk: (text: string) => void, forceRefresh: boolean = false) {
+    const url = forceRefresh ? `${API_URL}/briefing/stream?force_refresh=true` : `${API_URL}/briefing/stream`;
+    const res = await fetch(url, { headers: { Accept: "text/event-stream" } });
+    if (!res.ok || !res.body) throw new Error("Failed to stream briefing");
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE events are separated by a blank line
+        let sep;
+        while ((sep = buffer.indexOf("\n\n")) !== -1) {
+            const raw = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            let event = "message";
+            let data = "";
+            for (const line of raw.split("\n")) {
+                if (line.startsWith("event:")) event = line.slice(6).trim();
+                else if (line.startsWith("data:")) data += line.slice(5).trim();
+            }
+            if (!data) continue;
+            const payload = JSON.parse(data);
+            if (event === "error") throw new Error(payload.detail || "Failed to stream briefing");
+            if (event === "done") return;
+            if (payload.text) onChunk(payload.text);
+        }
+    }
+}
+
 export async function uploadSchedule(file: File) {
     const formData = new FormData();
     formData.append("file", file);
@@ -61,8 +120,17 @@ export async function uploadSchedule(file: File) {
     return res.json();
 }
 
-export async function getEvents() {
-    const res = await fetch(`${API_URL}/schedule`);
+export async function getEvents(range?: { from: string; to: string }) {
+    // With a range, only that window is read (e.g. the visible calendar month)
+    const query = range ? `?from=${range.from}&to=${range.to}` : "";
+    const res = await fetch(`${API_URL}/schedule${query}`);
     if (!res.ok) throw new Error("Failed to fetch events");
     return res.json();
 }
+
+export async function getFirstEventDate(from: string): Promise<string | null> {
+    const res = await fetch(`${API_URL}/schedule?from=${from}&page_size=1&fields=date`);
+    if (!res.ok) throw new Error("Failed to fetch events");
+    const data = await res.json();
+    return data.events?.[0]?.date ?? null;
+}